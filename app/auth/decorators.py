@@ -6,6 +6,12 @@ from sanic import json
 from .role import Role
 
 
+def public(f: Callable) -> Callable:
+    """Помечает маршрут как не требующий JWT (см. apply_route_policies)."""
+    f.is_public = True
+    return f
+
+
 def requires_role(*required_roles: Role):
     def decorator(f: Callable):
         @wraps(f)
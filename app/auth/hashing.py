@@ -0,0 +1,47 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from settings import settings
+
+
+class HashingPoolBusy(Exception):
+    pass
+
+
+class HashingPool:
+    """Пул потоков для медленных хешей с ограниченной очередью."""
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self._capacity = workers + queue_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="hashing"
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._executor is None:
+            raise RuntimeError("Hashing pool is not started")
+
+        if self._pending >= self._capacity:
+            raise HashingPoolBusy("Hashing queue is full")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+
+hash_pool = HashingPool(settings.hash_pool_size, settings.hash_queue_size)
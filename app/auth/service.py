@@ -4,6 +4,7 @@ from passlib.hash import pbkdf2_sha256
 from pydantic import SecretStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.hashing import hash_pool
 from app.services.model_service import UserService
 
 
@@ -13,14 +14,23 @@ class AuthService:
         raw_password = password.get_secret_value()
         return pbkdf2_sha256.hash(raw_password)
 
+    @staticmethod
+    async def hash_password_async(password: SecretStr) -> str:
+        return await hash_pool.run(AuthService.hash_password, password)
+
+    @staticmethod
+    async def verify_password(password: SecretStr, password_hash: str) -> bool:
+        return await hash_pool.run(
+            pbkdf2_sha256.verify, password.get_secret_value(), password_hash
+        )
+
+    @staticmethod
     async def authenticate(
         email: str, password: SecretStr, session: AsyncSession
     ) -> Optional[dict]:
         user = await UserService.get_by_email(email, session)
 
-        if user and pbkdf2_sha256.verify(
-            password.get_secret_value(), user.password_hash
-        ):
+        if user and await AuthService.verify_password(password, user.password_hash):
             return {
                 "user_id": user.id,
                 "full_name": user.full_name,
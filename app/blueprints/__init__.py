@@ -3,6 +3,7 @@ from sanic import Blueprint
 from .admin import admin_bp
 from .auth import auth_bp
 from .data import data_bp
+from .metrics import metrics_bp
 from .user import user_bp
 from .webhook import webhook_bp
 
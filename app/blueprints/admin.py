@@ -1,16 +1,20 @@
-from sanic import Blueprint, json
+from sanic import Blueprint, json, raw
 from sanic_ext import openapi, validate
 from sanic_ext.extensions.openapi.definitions import RequestBody
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
 from app.auth.decorators import requires_role
 from app.auth.role import Role
 from app.auth.schema import UserCreate
 from app.auth.service import AuthService
+from app.middleware.session import read_only
+from app.services.account_cache import accounts_cache
 from app.services.model_service import UserService
 from app.schemas.account import UserWithAccountsResponse
 from app.schemas.user import UserUpdate
+from app.serialization import JSON_CONTENT_TYPE
+from app.utils.pagination import (decode_cursor, encode_cursor, parse_limit,
+                                  stream_ndjson, wants_ndjson)
 from database.models.user import User
 
 admin_bp = Blueprint("admin", url_prefix="/admin")
@@ -33,7 +37,7 @@ async def user_create(request, body):
         new_user = User(
             full_name=body.full_name,
             email=body.email,
-            password_hash=AuthService.hash_password(body.password),
+            password_hash=await AuthService.hash_password_async(body.password),
             role=body.role,
         )
         session.add(new_user)
@@ -52,7 +56,9 @@ async def user_delete(request, user_id: int):
             return json({"user": "not exist"})
 
         await session.delete(user)
+        await accounts_cache.notify(session, [user_id])
 
+    accounts_cache.invalidate(user_id)
     return json({"user": "deleted"})
 
 
@@ -78,24 +84,42 @@ async def user_update(request, body: UserUpdate, user_id: int):
 
 
 @admin_bp.get("/users-accounts")
+@read_only
 @openapi.definition(
     summary="Users accounts information",
+    description=(
+        "Paginated by user id: pass `limit` and the `X-Next-Cursor` header of "
+        "the previous page as `cursor`. `format=ndjson` or "
+        "`Accept: application/x-ndjson` streams all users."
+    ),
     response=[UserWithAccountsResponse],
     tag="Admin",
 )
+@openapi.parameter("limit", int)
+@openapi.parameter("cursor", str)
+@openapi.parameter("format", str)
 @requires_role(Role.ADMIN)
 async def users_accounts(request):
-    session = request.ctx.session
+    try:
+        limit = parse_limit(request)
+        cursor = request.args.get("cursor")
+        after_id = int(decode_cursor(cursor)[0]) if cursor else None
+    except ValueError:
+        return json({"error": "Invalid limit or cursor"}, status=400)
+
+    query = UserService.users_with_accounts_json_query(after_id)
 
-    result = await session.execute(
-        select(User).options(selectinload(User.accounts)).order_by(User.id)
-    )
+    if wants_ndjson(request):
+        return await stream_ndjson(request, query, lambda row: row.data.encode())
 
-    users = result.scalars().all()
+    session = request.ctx.session
+    result = await session.execute(query.limit(limit + 1))
+    rows = result.all()
 
-    validate_data = [
-        UserWithAccountsResponse.model_validate(user).model_dump(mode="json")
-        for user in users
-    ]
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].id)
 
-    return json(validate_data)
+    body = "[" + ",".join(row.data for row in rows) + "]"
+    return raw(body, content_type=JSON_CONTENT_TYPE, headers=headers)
@@ -3,12 +3,12 @@ from pydantic import SecretStr
 from sanic import Blueprint, json
 from sanic_ext import openapi
 
-from app.auth.decorators import requires_role
+from app.auth.decorators import public, requires_role
 from app.auth.role import Role
 from app.auth.service import AuthService
 from app.jwt.service import (create_jwt_token, decode_jwt_token,
-                             delete_refresh_tokens, retrieve_refresh_token,
-                             revoked_token, store_refresh_token)
+                             delete_refresh_tokens, revoked_token,
+                             rotate_refresh_token, store_refresh_token)
 from app.services.model_service import UserService
 from app.schemas.auth import LogoutResponse, TokenResponse
 from settings import settings
@@ -17,6 +17,7 @@ auth_bp = Blueprint("auth", url_prefix="/auth")
 
 
 @auth_bp.post("/login")
+@public
 @openapi.definition(summary="User authentication", response=[TokenResponse], tag="Auth")
 async def login(request):
     email = request.json.get("email")
@@ -52,6 +53,7 @@ async def login(request):
 
 
 @auth_bp.post("/refresh")
+@public
 @openapi.definition(
     summary="Refresh access token", response=[TokenResponse], tag="Auth"
 )
@@ -64,29 +66,31 @@ async def refresh_token(request):
     session = request.ctx.session
     try:
         async with session.begin():
-            payload = await decode_jwt_token(refresh_token, session)
+            payload = await decode_jwt_token(refresh_token)
 
             if payload.get("type") != "refresh":
                 return json({"error": "Invalid token type"}, status=401)
 
-            user_id = payload["sub"]
-            stored_token = retrieve_refresh_token(user_id, session)
-
-            if stored_token != refresh_token:
-                return json({"error": "Invalid refresh token"}, status=401)
+            user_id = int(payload["sub"])
 
             user = await UserService.get_user(user_id, session)
             if not user:
                 return json({"error": "User not found"}, status=404)
 
-            user_data = {"user_id": user.id, "email": user.email, "role": user.role}
+            user_data = {
+                "user_id": user.id,
+                "full_name": user.full_name,
+                "email": user.email,
+                "role": user.role,
+            }
 
             new_access_token = create_jwt_token(user_data, "access")
 
             new_refresh_token = create_jwt_token(user_data, "refresh")
-            await store_refresh_token(
-                user_id=user_id, refresh_token=new_refresh_token, session=session
-            )
+            if not await rotate_refresh_token(
+                user_id, refresh_token, new_refresh_token, session
+            ):
+                return json({"error": "Invalid refresh token"}, status=401)
 
             return json(
                 {
@@ -0,0 +1,15 @@
+from sanic import Blueprint
+from sanic.response import text
+from sanic_ext import openapi
+
+from app.auth.decorators import public
+from app.metrics import CONTENT_TYPE, render
+
+metrics_bp = Blueprint("metrics")
+
+
+@metrics_bp.get("/metrics")
+@public
+@openapi.exclude()
+async def metrics(request):
+    return text(render(), content_type=CONTENT_TYPE)
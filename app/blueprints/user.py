@@ -1,59 +1,152 @@
+from datetime import date, datetime, timezone
+from uuid import UUID
+
 from sanic import Blueprint, json
 from sanic_ext import openapi
-from sqlalchemy import select
 
-from app.logger import LOGS
-from app.schemas.account import AccountsResponse
+from app.metrics import accounts_cache_total
+from app.middleware.session import read_only
+from app.schemas.account import AccountSummaryResponse, AccountsResponse
 from app.schemas.transaction import TransactionsResponse
-from database.models.account import Account
-from database.models.transaction import Transaction
+from app.serialization import (accounts_adapter, json_line, json_list,
+                               summary_adapter, transaction_adapter,
+                               transactions_adapter)
+from app.services.account_cache import accounts_cache
+from app.services.model_service import UserService
+from app.services.transaction_service import TransactionService
+from app.utils.pagination import (decode_cursor, encode_cursor, parse_limit,
+                                  stream_ndjson, wants_ndjson)
+from database.engine import _sessionmaker
 
 user_bp = Blueprint("user", url_prefix="/user")
 
 
 @user_bp.get("/accounts")
+@read_only
 @openapi.definition(
     summary="Users accounts information", response=[AccountsResponse], tag="User"
 )
 async def user_accounts(request):
     user = request.ctx.user
-    LOGS.debug(f"{user}")
 
     if not user:
         return json({"error": "User not found"}, status=404)
 
-    session = request.ctx.session
-    query = select(Account).filter_by(user_id=user["id"])
-    result = await session.execute(query)
-    accounts = result.scalars().all()
+    accounts = accounts_cache.get(user["id"])
+    if accounts is not None:
+        accounts_cache_total.inc("hit")
+        return json_list(accounts_adapter, accounts)
+
+    accounts_cache_total.inc("miss")
+    fill = accounts_cache.begin_fill(user["id"])
+    query = UserService.user_accounts_query(user["id"])
+    if fill.read_primary:
+        # Реплика может ещё не видеть только что закоммиченный вебхук
+        async with _sessionmaker() as session:
+            result = await session.execute(query)
+    else:
+        result = await request.ctx.session.execute(query)
 
-    validate_data = [
-        AccountsResponse.model_validate(account).model_dump(mode="json")
-        for account in accounts
-    ]
-    return json(validate_data)
+    accounts = accounts_adapter.validate_python(
+        result.scalars().all(), from_attributes=True
+    )
+    accounts_cache.fill(fill, accounts)
+    return json_list(accounts_adapter, accounts)
+
+
+def parse_date_range(request) -> tuple[date, date]:
+    """
+    from и to (ISO-даты UTC, включительно); по умолчанию — с начала
+    текущего месяца по сегодня.
+    """
+    today = datetime.now(timezone.utc).date()
+    start = request.args.get("from")
+    end = request.args.get("to")
+    start = date.fromisoformat(start) if start else today.replace(day=1)
+    end = date.fromisoformat(end) if end else today
+    if start > end:
+        raise ValueError("from is after to")
+    return start, end
+
+
+@user_bp.get("/summary")
+@read_only
+@openapi.definition(
+    summary="Per-account totals for a date range",
+    description=(
+        "Incoming and outgoing totals, net flow and transaction count per "
+        "account for the UTC days `from`..`to` inclusive (ISO dates). "
+        "Defaults to the current month."
+    ),
+    response=[AccountSummaryResponse],
+    tag="User",
+)
+@openapi.parameter("from", str)
+@openapi.parameter("to", str)
+async def user_summary(request):
+    user = request.ctx.user
+
+    if not user:
+        return json({"error": "User not found"}, status=404)
+
+    try:
+        start, end = parse_date_range(request)
+    except ValueError:
+        return json({"error": "Invalid date range"}, status=400)
+
+    session = request.ctx.session
+    result = await session.execute(
+        TransactionService.account_summary_query(user["id"], start, end)
+    )
+    return json_list(summary_adapter, result.all())
 
 
 @user_bp.get("/transactions")
+@read_only
 @openapi.definition(
     summary="Users transactions information",
+    description=(
+        "Keyset pagination over (created_at, id): pass `limit` and the "
+        "`X-Next-Cursor` header of the previous page as `cursor`. "
+        "`format=ndjson` or `Accept: application/x-ndjson` streams the whole history."
+    ),
     response=[TransactionsResponse],
     tag="User",
 )
+@openapi.parameter("limit", int)
+@openapi.parameter("cursor", str)
+@openapi.parameter("format", str)
 async def user_transactions(request):
     user = request.ctx.user
 
     if not user:
         return json({"error": "User not found"}, status=404)
 
+    try:
+        limit = parse_limit(request)
+        cursor = request.args.get("cursor")
+        after = None
+        if cursor:
+            created_at, transaction_id = decode_cursor(cursor)
+            after = (datetime.fromisoformat(created_at), UUID(transaction_id))
+    except ValueError:
+        return json({"error": "Invalid limit or cursor"}, status=400)
+
+    query = TransactionService.user_transactions_query(user["id"], after)
+
+    if wants_ndjson(request):
+        return await stream_ndjson(
+            request, query, lambda row: json_line(transaction_adapter, row)
+        )
+
     session = request.ctx.session
+    result = await session.execute(query.limit(limit + 1))
+    rows = result.all()
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
 
-    query = select(Transaction).filter_by(user_id=user["id"])
-    result = await session.execute(query)
-    transactions = result.scalars().all()
+    return json_list(transactions_adapter, rows, headers=headers)
 
-    validate_data = [
-        TransactionsResponse.model_validate(transaction).model_dump(mode="json")
-        for transaction in transactions
-    ]
-    return json(validate_data)
@@ -1,25 +1,35 @@
+from pydantic import ValidationError
 from sanic import Blueprint, json
+from sqlalchemy.exc import DBAPIError
 from sanic_ext import openapi
 from sanic_ext.extensions.openapi.definitions import RequestBody
-from sqlalchemy import select
 
-from app.schemas.webhook import WebhookPayload
+from app.auth.decorators import public
+from app.logger import LOGS
+from app.schemas.webhook import (BatchItemStatus, WebhookBatchResponse,
+                                 WebhookPayload)
+from app.serialization import loads
+from app.services.account_cache import accounts_cache
+from app.services.admission import (admission_control, webhook_admission,
+                                    webhook_rate_limiter)
+from app.services.transaction_service import (TransactionService,
+                                              recent_transaction_ids)
+from app.services.write_coalescer import webhook_coalescer
 from app.signature.signature_service import TransactionSignatureService
-from database.models.account import Account
-from database.models.base import Decimal10_2
-from database.models.transaction import Transaction
+from settings import settings
 
 webhook_bp = Blueprint("webhook", url_prefix="/webhook")
 
 
 @webhook_bp.post("/transaction")
+@public
 @openapi.definition(
     body=RequestBody(WebhookPayload, required=True),
     summary="Create new transaction",
     tag="Transaction",
 )
+@admission_control(webhook_admission, webhook_rate_limiter)
 async def transaction_webhook(request):
-    session = request.ctx.session
     body = request.json
 
     is_valid = TransactionSignatureService.verify_signature(body)
@@ -29,31 +39,111 @@ async def transaction_webhook(request):
 
     payload = WebhookPayload(**body)
 
-    async with session.begin():
-        existing_transaction = await session.execute(
-            select(Transaction).filter_by(id=payload.transaction_id).with_for_update()
+    if payload.transaction_id in recent_transaction_ids:
+        return json({"error": "Duplicate transaction"}, status=409)
+
+    if settings.webhook_coalesce_window_ms > 0:
+        balance = await webhook_coalescer.submit(payload)
+    else:
+        session = request.ctx.session
+        async with session.begin():
+            batch = await TransactionService.apply_batch([payload], session)
+        accounts_cache.invalidate_many(batch.owners)
+        balance = batch.balances.get(payload.transaction_id)
+
+    recent_transaction_ids.add(payload.transaction_id)
+
+    if balance is None:
+        return json({"error": "Duplicate transaction"}, status=409)
+
+    return json({"status": "success", "balance": str(balance)})
+
+
+def parse_batch_body(request) -> list:
+    if request.content_type.startswith("application/x-ndjson"):
+        return [
+            loads(line) for line in request.body.splitlines() if line.strip()
+        ]
+
+    body = request.json
+    if not isinstance(body, list):
+        raise ValueError("Expected a JSON array of payloads")
+    return body
+
+
+@webhook_bp.post("/transactions/batch")
+@public
+@openapi.definition(
+    body=RequestBody([WebhookPayload], required=True),
+    summary="Create transactions in bulk (JSON array or NDJSON)",
+    response=[WebhookBatchResponse],
+    tag="Transaction",
+)
+@admission_control(webhook_admission, webhook_rate_limiter)
+async def transactions_batch_webhook(request):
+    try:
+        items = parse_batch_body(request)
+    except ValueError as e:
+        return json({"error": f"Invalid batch body: {e}"}, status=400)
+
+    if len(items) > settings.webhook_batch_max_size:
+        return json(
+            {"error": f"Batch size exceeds {settings.webhook_batch_max_size} items"},
+            status=413,
         )
-        if existing_transaction.scalar():
-            return json({"error": "Duplicate transaction"}, status=409)
-
-        account = await session.get(Account, payload.account_id)
-        if not account:
-            account = Account(
-                id=payload.account_id,
-                user_id=payload.user_id,
-                balance=Decimal10_2("0.00"),
-            )
-            session.add(account)
-
-        transaction = Transaction(
-            id=payload.transaction_id,
-            user_id=payload.user_id,
-            amount=payload.amount,
-            account_id=payload.account_id,
-            signature=payload.signature,
+
+    results = []
+    accepted = {}
+    signatures = TransactionSignatureService.verify_many(items)
+    for item, is_valid in zip(items, signatures):
+        transaction_id = item.get("transaction_id") if isinstance(item, dict) else None
+        result = {"transaction_id": transaction_id}
+        results.append(result)
+
+        if not is_valid:
+            result["status"] = BatchItemStatus.BAD_SIGNATURE.value
+            continue
+
+        try:
+            payload = WebhookPayload(**item)
+        except ValidationError:
+            result["status"] = BatchItemStatus.INVALID.value
+            continue
+
+        if (
+            payload.transaction_id in accepted
+            or payload.transaction_id in recent_transaction_ids
+        ):
+            result["status"] = BatchItemStatus.DUPLICATE.value
+            continue
+
+        accepted[payload.transaction_id] = (payload, result)
+
+    payloads = [payload for payload, _ in accepted.values()]
+    session = request.ctx.session
+    try:
+        async with session.begin():
+            batch = await TransactionService.apply_batch(payloads, session)
+        batches = [batch] * len(payloads)
+    except DBAPIError as e:
+        LOGS.warning(
+            "Webhook batch of %d failed, applying one by one: %s", len(payloads), e
         )
-        session.add(transaction)
+        batches = await TransactionService.apply_each(payloads, session)
+
+    owners = set()
+    for (transaction_id, (_, result)), batch in zip(accepted.items(), batches):
+        if isinstance(batch, Exception):
+            result["status"] = BatchItemStatus.ERROR.value
+            continue
 
-        account.balance += payload.amount
+        owners.update(batch.owners)
+        recent_transaction_ids.add(transaction_id)
+        if transaction_id in batch.balances:
+            result["status"] = BatchItemStatus.OK.value
+            result["balance"] = str(batch.balances[transaction_id])
+        else:
+            result["status"] = BatchItemStatus.DUPLICATE.value
+    accounts_cache.invalidate_many(owners)
 
-        return json({"status": "success", "balance": str(account.balance)})
+    return json({"results": results})
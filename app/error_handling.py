@@ -7,7 +7,9 @@ from sanic.exceptions import Forbidden, NotFound, Unauthorized
 from sanic.request import Request
 from sanic.response import HTTPResponse, json
 
+from app.auth.hashing import HashingPoolBusy
 from app.logger import LOGS
+from app.services.admission import AdmissionRejected
 
 
 def format_validation_errors(errors: List[Dict]) -> List[Dict]:
@@ -46,8 +48,22 @@ async def global_error_handler(request: Request, exception: Exception) -> HTTPRe
         if isinstance(exception, Forbidden):
             return json({"error": "Access denied"}, status=403)
 
+        if isinstance(exception, AdmissionRejected):
+            return json(
+                {"error": str(exception)},
+                status=exception.status,
+                headers={"Retry-After": str(exception.retry_after)},
+            )
+
+        if isinstance(exception, HashingPoolBusy):
+            return json(
+                {"error": "Service busy, try again later"},
+                status=503,
+                headers={"Retry-After": "1"},
+            )
+
         error_id = generate_error_id()
-        LOGS.error(f"Unhandled exception [{error_id}]", exc_info=exception)
+        LOGS.error("Unhandled exception [%s]", error_id, exc_info=exception)
 
         with sentry_sdk.new_scope() as scope:
             scope.set_tag("error_id", error_id)
@@ -75,7 +91,9 @@ async def global_error_handler(request: Request, exception: Exception) -> HTTPRe
         error_id = error_id or generate_error_id()
 
         LOGS.error(
-            f"CRITICAL: Error in error handler [{error_id}]: {str(inner_ex)}",
+            "CRITICAL: Error in error handler [%s]: %s",
+            error_id,
+            inner_ex,
             exc_info=True,
         )
 
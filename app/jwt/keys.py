@@ -0,0 +1,80 @@
+from pathlib import Path
+from typing import Any, Optional
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed448, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (load_pem_private_key,
+                                                          load_pem_public_key)
+from jwt import InvalidTokenError
+
+from settings import settings
+
+
+def infer_algorithm(key: Any, preferred: str) -> str:
+    """Алгоритм ключа ротации по его типу и семейству текущего алгоритма."""
+    if isinstance(key, rsa.RSAPublicKey):
+        return preferred if preferred[:2] in ("RS", "PS") else "RS256"
+    if isinstance(key, ec.EllipticCurvePublicKey):
+        return {256: "ES256", 384: "ES384", 521: "ES512"}[key.curve.key_size]
+    if isinstance(key, (ed25519.Ed25519PublicKey, ed448.Ed448PublicKey)):
+        return "EdDSA"
+    raise ValueError(f"Unsupported JWT key type: {type(key).__name__}")
+
+
+class KeyManager:
+    """Ключи JWT: подпись текущим ключом, проверка ключом по kid."""
+
+    def __init__(self):
+        self.kid: Optional[str] = None
+        self._signing_key: Any = None
+        self._signing_algorithm: Optional[str] = None
+        self._verify_keys: dict[str, tuple[str, Any]] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._signing_key is not None
+
+    def load(self) -> None:
+        private_key = load_pem_private_key(
+            settings.private_key.get_secret_value().encode(), password=None
+        )
+        public_key = (
+            load_pem_public_key(settings.public_key.encode())
+            if settings.jwt_public_key_path
+            else private_key.public_key()
+        )
+
+        verify_keys = {settings.jwt_key_id: (settings.algorithm, public_key)}
+        for kid, path in settings.jwt_previous_public_keys.items():
+            key = load_pem_public_key(Path(path).read_bytes())
+            verify_keys[kid] = (infer_algorithm(key, settings.algorithm), key)
+
+        self.kid = settings.jwt_key_id
+        self._signing_algorithm = settings.algorithm
+        self._verify_keys = verify_keys
+        self._signing_key = private_key
+
+    def encode(self, payload: dict) -> str:
+        if not self.loaded:
+            self.load()
+        return jwt.encode(
+            payload,
+            self._signing_key,
+            algorithm=self._signing_algorithm,
+            headers={"typ": "JWT", "kid": self.kid},
+        )
+
+    def decode(self, token: str, **kwargs) -> dict:
+        if not self.loaded:
+            self.load()
+
+        kid = jwt.get_unverified_header(token).get("kid", self.kid)
+        try:
+            algorithm, key = self._verify_keys[kid]
+        except KeyError:
+            raise InvalidTokenError("Unknown key id")
+
+        return jwt.decode(token, key, algorithms=[algorithm], **kwargs)
+
+
+key_manager = KeyManager()
@@ -0,0 +1,64 @@
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models.token import RevokedToken
+
+
+class RevokedTokenCache:
+    """Отозванные jti в памяти процесса; запись живёт до exp токена."""
+
+    purge_interval: float = 60.0
+
+    def __init__(self):
+        self._entries: dict[str, float] = {}
+        self._next_purge = 0.0
+
+    def __contains__(self, jti: str) -> bool:
+        expires_at = self._entries.get(jti)
+        if expires_at is None:
+            return False
+
+        if expires_at <= time.time():
+            self._entries.pop(jti, None)
+            return False
+
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        self._entries[jti] = expires_at.timestamp()
+
+        now = time.time()
+        if now >= self._next_purge:
+            self.purge_expired(now)
+
+    def apply_notification(self, data: dict) -> None:
+        """Отзыв, сделанный другим воркером."""
+        self.add(data["jti"], datetime.fromtimestamp(data["expires_at"], timezone.utc))
+
+    def purge_expired(self, now: Optional[float] = None) -> None:
+        now = now or time.time()
+        self._entries = {
+            jti: expires_at
+            for jti, expires_at in self._entries.items()
+            if expires_at > now
+        }
+        self._next_purge = now + self.purge_interval
+
+    async def load(self, session: AsyncSession) -> None:
+        result = await session.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(
+                ~RevokedToken.is_expired
+            )
+        )
+        self._entries = {jti: expires_at.timestamp() for jti, expires_at in result}
+        self._next_purge = time.time() + self.purge_interval
+
+
+revoked_tokens = RevokedTokenCache()
@@ -1,17 +1,32 @@
+import hashlib
+import hmac
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 
-import jwt
 from jwt import ExpiredSignatureError, InvalidTokenError
-from sqlalchemy import delete, exists, select
+from sqlalchemy import Delete, Update, delete, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from passlib.context import CryptContext
 
+from app.jwt.keys import key_manager
+from app.jwt.revocation import revoked_tokens
+from app.metrics import jwt_decode_seconds
+from app.services.invalidation import invalidation_bus
+from app.utils.cache import ExpiringLRUCache
+from database.engine import after_commit
 from database.models.token import RefreshToken, RevokedToken
 from settings import settings
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_refresh_token_hmac = hmac.new(
+    settings.secret_key.get_secret_value().encode(), digestmod=hashlib.sha256
+)
+
+verified_tokens = ExpiringLRUCache(settings.jwt_verified_cache_size)
+
+REVOKED_TOKEN_TOPIC = "revoked_token"
+
 
 def create_jwt_token(
         user_data: dict,
@@ -38,30 +53,31 @@ def create_jwt_token(
         "jti": str(uuid.uuid4()),
     }
 
-    return jwt.encode(
-        payload,
-        settings.private_key.get_secret_value(),
-        algorithm=settings.algorithm,
-        headers={"typ": "JWT"},
-    )
+    return key_manager.encode(payload)
 
 
-async def decode_jwt_token(token: str, session: AsyncSession) -> dict:
+async def decode_jwt_token(token: str) -> dict:
+    started = time.perf_counter()
+    # Повторный запрос с тем же access-токеном не проверяет подпись заново;
+    # запись живёт до exp токена, отзыв проверяется всегда
+    payload = verified_tokens.get(token)
+    cache = "hit" if payload is not None else "miss"
     try:
-        payload = jwt.decode(
-            token,
-            settings.public_key,
-            algorithms=[settings.algorithm],
-            options={"require": ["exp", "iat", "sub", "jti"]},
-        )
+        if payload is None:
+            payload = key_manager.decode(
+                token, options={"require": ["exp", "iat", "sub", "jti"]}
+            )
 
-        if payload.get("type") not in ["access", "refresh"]:
-            raise InvalidTokenError("Invalid token type")
+            if payload.get("type") not in ["access", "refresh"]:
+                raise InvalidTokenError("Invalid token type")
 
-        if "jti" not in payload:
-            raise InvalidTokenError("Missing token ID")
+            if "jti" not in payload:
+                raise InvalidTokenError("Missing token ID")
 
-        if await is_token_revoked(payload["jti"], session):
+            if payload["type"] == "access":
+                verified_tokens.set(token, payload, payload["exp"])
+
+        if is_token_revoked(payload["jti"]):
             raise InvalidTokenError("Token revoked")
 
         return payload
@@ -70,41 +86,81 @@ async def decode_jwt_token(token: str, session: AsyncSession) -> dict:
         raise ExpiredSignatureError("Token expired")
     except Exception as e:
         raise InvalidTokenError(f"Invalid token: {str(e)}")
+    finally:
+        jwt_decode_seconds.observe(time.perf_counter() - started, cache)
 
 
-async def is_token_revoked(jti: str, session: AsyncSession) -> bool:
-    query = select(exists().where(RevokedToken.jti == jti))
-    return bool(await session.scalar(query))
+def is_token_revoked(jti: str) -> bool:
+    return jti in revoked_tokens
 
 
 async def revoked_token(user: dict, token_type, jti: str, expires_at, session: AsyncSession):
-    if not await is_token_revoked(jti, session):
-        revoked_token = RevokedToken(user_id=user["id"], token_type=token_type,jti=jti, expires_at=expires_at)
-        session.add(revoked_token)
+    await session.execute(
+        insert(RevokedToken)
+        .values(user_id=user["id"], token_type=token_type, jti=jti, expires_at=expires_at)
+        .on_conflict_do_nothing()
+    )
+    # Все воркеры, включая этот, узнают об отзыве только после COMMIT:
+    # при откате токен остаётся действующим
+    await invalidation_bus.notify(
+        session, REVOKED_TOKEN_TOPIC, jti=jti, expires_at=expires_at.timestamp()
+    )
+    after_commit(session, lambda: revoked_tokens.add(jti, expires_at))
+
+
+def hash_refresh_token(refresh_token: str) -> str:
+    digest = _refresh_token_hmac.copy()
+    digest.update(refresh_token.encode())
+    return digest.hexdigest()
+
+
+def refresh_token_expires_at() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(
+        seconds=settings.jwt_refresh_token_expiration
+    )
 
 
 async def store_refresh_token(user_id: int, refresh_token: str, session: AsyncSession):
     await delete_refresh_tokens(user_id, session)
 
-    hashed_token = pwd_context.hash(refresh_token)
-
     new_token = RefreshToken(
         user_id=user_id,
-        token=hashed_token,
-        expires_at=datetime.now()
-        + timedelta(seconds=settings.jwt_refresh_token_expiration),
+        token_hash=hash_refresh_token(refresh_token),
+        expires_at=refresh_token_expires_at(),
     )
     session.add(new_token)
 
 
-async def retrieve_refresh_token(user_id, session: AsyncSession):
-    token = await session.scalar(
-        select(RefreshToken.token)
+def rotate_refresh_token_query(
+    user_id: int, token_hash: str, new_token_hash: str, expires_at: datetime
+) -> Update:
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == token_hash)
         .where(RefreshToken.user_id == user_id)
         .where(RefreshToken.is_active)
+        .values(token_hash=new_token_hash, expires_at=expires_at)
+        .returning(RefreshToken.id)
+    )
+
+
+async def rotate_refresh_token(
+    user_id: int, refresh_token: str, new_refresh_token: str, session: AsyncSession
+) -> bool:
+    rotated = await session.scalar(
+        rotate_refresh_token_query(
+            user_id,
+            hash_refresh_token(refresh_token),
+            hash_refresh_token(new_refresh_token),
+            refresh_token_expires_at(),
+        )
     )
-    return token
+    return rotated is not None
+
+
+def delete_refresh_tokens_query(user_id: int) -> Delete:
+    return delete(RefreshToken).where(RefreshToken.user_id == user_id)
 
 
 async def delete_refresh_tokens(user_id: int, session: AsyncSession):
-    await session.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+    await session.execute(delete_refresh_tokens_query(user_id))
@@ -1,41 +1,200 @@
+import copy
 import logging
+import queue
+import random
+from datetime import datetime, timezone
 from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from queue import Queue
 
+import orjson
+from sanic import Request
+from sanic.exceptions import SanicException
 
-def setup_logging(name: str, log_file: str, level: logging) -> logging.Logger:
+from settings import settings
+
+
+class RouteFilter(logging.Filter):
+    """Проставляет маршрут запроса и прореживает записи ниже WARNING."""
+
+    def __init__(self, sample_rates: dict[str, float]):
+        super().__init__()
+        self.sample_rates = sample_rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        try:
+            route = Request.get_current().route
+        except SanicException:
+            route = None
+        record.route = route.name if route is not None else None
+
+        if record.levelno >= logging.WARNING or not self.sample_rates:
+            return True
+        rate = self.sample_rates.get(record.route, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        route = getattr(record, "route", None)
+        if route:
+            entry["route"] = route
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler, кладущий в очередь уже собранное сообщение и трейсбек."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Аргументы могут измениться, пока запись ждёт слушателя, а exc_info
+        # держал бы в очереди кадры стека
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+_exc_formatter = logging.Formatter()
+
+
+class _BatchWriteMixin:
+    """Пишет пачку записей одним write и одним flush."""
+
+    terminator: str
+
+    def handle_batch(self, records: list[logging.LogRecord]) -> None:
+        lines = [
+            self.format(record) + self.terminator
+            for record in records
+            if record.levelno >= self.level and self.filter(record)
+        ]
+        if not lines:
+            return
+
+        data = "".join(lines)
+        self.acquire()
+        try:
+            self._write_batch(data)
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+    def _write_batch(self, data: str) -> None:
+        self.stream.write(data)
+        self.flush()
+
+
+class BatchStreamHandler(_BatchWriteMixin, logging.StreamHandler):
+    pass
+
+
+class BatchRotatingFileHandler(_BatchWriteMixin, RotatingFileHandler):
+    def _write_batch(self, data: str) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0:
+            size = len(data.encode(self.encoding or "utf-8"))
+            if self.stream.tell() + size >= self.maxBytes:
+                self.doRollover()
+        super()._write_batch(data)
+
+
+class BatchQueueListener(QueueListener):
+    """Забирает из очереди всё накопившееся (до batch_size) и отдаёт обработчикам пачкой."""
+
+    def __init__(self, log_queue: Queue, *handlers, batch_size: int = 256):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def _monitor(self):
+        q = self.queue
+        stopping = False
+        while not stopping:
+            batch = []
+            record = self.dequeue(True)
+            while True:
+                q.task_done()
+                if record is self._sentinel:
+                    stopping = True
+                    break
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self.dequeue(False)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self.handle_batch(batch)
+
+    def handle_batch(self, records: list[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            if isinstance(handler, _BatchWriteMixin):
+                handler.handle_batch(records)
+            else:
+                for record in records:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+
+
+def setup_logging(name: str, log_file: str, level: int | str) -> logging.Logger:
     log_dir = Path("logs")
     log_dir.mkdir(parents=True, exist_ok=True)
 
     logger = logging.getLogger(name)
     logger.setLevel(level)
+    # Маршрут нужен только JSON-формату и прореживанию
+    if settings.log_format == "json" or settings.log_sample_rates:
+        logger.addFilter(RouteFilter(settings.log_sample_rates))
 
     log_queue = Queue()
-    formatter = logging.Formatter(
-        "[%(asctime)s]:[%(name)s]:[%(levelname)s] - %(message)s"
-    )
+    if settings.log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "[%(asctime)s]:[%(name)s]:[%(levelname)s] - %(message)s"
+        )
 
-    file_handler = RotatingFileHandler(
+    file_handler = BatchRotatingFileHandler(
         filename=log_dir / log_file,
         maxBytes=10 * 1024 * 1024,
         backupCount=5,
         encoding="utf-8",
+        delay=True,
     )
     file_handler.setFormatter(formatter)
 
-    console_handler = logging.StreamHandler()
+    console_handler = BatchStreamHandler()
     console_handler.setFormatter(formatter)
 
-    listener = QueueListener(
-        log_queue, file_handler, console_handler, respect_handler_level=True
+    listener = BatchQueueListener(
+        log_queue, file_handler, console_handler, batch_size=settings.log_batch_size
     )
     listener.start()
 
-    queue_handler = QueueHandler(log_queue)
+    queue_handler = LazyQueueHandler(log_queue)
     logger.addHandler(queue_handler)
 
     return logger
 
 
-LOGS = setup_logging("app", "app_logs", logging.DEBUG)
+LOGS = setup_logging(
+    "app",
+    "app_logs",
+    settings.log_level or (logging.DEBUG if settings.debug else logging.INFO),
+)
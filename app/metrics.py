@@ -0,0 +1,186 @@
+"""Метрики процесса в текстовом формате Prometheus."""
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Iterable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Для операций в микросекунды: подписи, middleware
+FAST_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.1,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+registry: list["Metric"] = []
+
+
+class Metric(ABC):
+    type: str = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        registry.append(self)
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self._samples(),
+        ]
+
+    @abstractmethod
+    def _samples(self) -> list[str]:
+        ...
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        # Серия: счётчики по корзинам (последняя — +Inf), затем сумма
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                label_str = _format_labels((*self.labelnames, "le"), (*labels, bound))
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {series[-1]}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    return "\n".join(line for metric in registry for line in metric.render()) + "\n"
+
+
+middleware_seconds = Histogram(
+    "http_middleware_seconds", "Time spent in each middleware", ("middleware",),
+    buckets=FAST_BUCKETS,
+)
+handler_seconds = Histogram(
+    "http_handler_seconds", "Time spent in route handlers", ("route",)
+)
+responses_total = Counter(
+    "http_responses_total", "Responses by route and status code", ("route", "status")
+)
+db_query_seconds = Histogram(
+    "db_query_seconds", "SQL statement execution time", ("engine",)
+)
+db_pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to check out a pooled DB connection, including wait and pre-ping",
+    ("engine",),
+)
+jwt_decode_seconds = Histogram(
+    "jwt_decode_seconds",
+    "JWT decode and validation time by verified-token cache result",
+    ("cache",),
+    buckets=FAST_BUCKETS,
+)
+signature_verify_seconds = Histogram(
+    "signature_verify_seconds",
+    "Webhook signature verification time per call (single webhook or batch)",
+    ("mode",),
+    buckets=FAST_BUCKETS,
+)
+admission_rejected_total = Counter(
+    "admission_rejected_total",
+    "Requests shed before the handler by reason (rate_limit, queue_full, "
+    "queue_timeout, pool_wait)",
+    ("reason",),
+)
+accounts_cache_total = Counter(
+    "accounts_cache_total", "/user/accounts cache lookups by result", ("result",)
+)
+
+
+def route_label(request) -> str:
+    route = request.route
+    return route.name if route is not None else "unmatched"
+
+
+def timed_middleware(middleware: Callable) -> Callable:
+    name = middleware.__name__
+
+    @wraps(middleware)
+    async def wrapper(*args):
+        started = time.perf_counter()
+        try:
+            return await middleware(*args)
+        finally:
+            middleware_seconds.observe(time.perf_counter() - started, name)
+
+    return wrapper
+
+
+def instrument_app(app) -> None:
+    @app.signal("http.handler.before")
+    async def handler_started(request):
+        request.ctx.handler_started = time.perf_counter()
+
+    @app.signal("http.handler.after")
+    async def handler_finished(request):
+        handler_seconds.observe(
+            time.perf_counter() - request.ctx.handler_started, route_label(request)
+        )
+
+    @app.signal("http.lifecycle.response")
+    async def count_response(request, response):
+        responses_total.inc(route_label(request), response.status)
+
@@ -6,10 +6,19 @@ from app.jwt.service import (ExpiredSignatureError, InvalidTokenError,
 from app.logger import LOGS
 
 
-async def jwt_authentication(request):
-    public_routes = ["login", "refresh", "docs", "openapi.json", "transaction"]
+def apply_route_policies(app) -> None:
+    """Один раз при старте: публичны @public и документация OpenAPI."""
+    docs_prefix = app.config.OAS_URL_PREFIX.strip("/")
+
+    for route in app.router.routes:
+        route.ctx.public = getattr(route.handler, "is_public", False) or (
+            route.path == docs_prefix or route.path.startswith(docs_prefix + "/")
+        )
 
-    if request.path.split("/")[-1] in public_routes:
+
+async def jwt_authentication(request):
+    route = request.route
+    if route is None or getattr(route.ctx, "public", False):
         return
 
     auth_header = request.headers.get("Authorization", "")
@@ -20,14 +29,7 @@ async def jwt_authentication(request):
     token = auth_header.split(" ", 1)[1]
 
     try:
-        session = request.ctx.session
-
-        payload = await decode_jwt_token(token, session)
-
-        if session.in_transaction():
-            await session.commit()
-
-        LOGS.debug(f"Decoded payload: {payload}")
+        payload = await decode_jwt_token(token)
 
         if payload["type"] != "access":
             return json(
@@ -50,5 +52,5 @@ async def jwt_authentication(request):
     except InvalidTokenError as e:
         return json({"error": str(e)}, status=401)
     except Exception as e:
-        LOGS.error(f"JWT Authentication error: {str(e)}")
+        LOGS.error("JWT Authentication error: %s", e)
         return json({"error": "Authentication failed"}, status=401)
@@ -0,0 +1,40 @@
+from app.logger import LOGS
+from database.query_stats import QueryStats, query_stats_ctx
+from settings import settings
+
+
+async def track_queries(request):
+    # Лимиты проверяются только в debug, в проде остаются счётчик и время
+    if settings.debug:
+        stats = QueryStats(
+            budget=settings.db_query_budget,
+            repeat_limit=settings.db_repeated_query_limit,
+            strict=settings.db_query_budget_strict,
+        )
+    else:
+        stats = QueryStats()
+
+    request.ctx.query_stats = stats
+    request.ctx.query_stats_token = query_stats_ctx.set(stats)
+
+
+async def report_queries(request, response):
+    stats = getattr(request.ctx, "query_stats", None)
+    if stats is None:
+        return
+
+    stats.close()
+    query_stats_ctx.reset(request.ctx.query_stats_token)
+
+    if stats.violations:
+        LOGS.warning(
+            "%s %s: %d queries, %.1f ms in DB. %s",
+            request.method,
+            request.path,
+            stats.count,
+            stats.time * 1000,
+            " ".join(stats.violations),
+        )
+
+    if settings.debug:
+        response.headers["X-DB-Queries"] = str(stats.count)
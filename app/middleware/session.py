@@ -1,12 +1,56 @@
-from database.engine import _base_model_session_ctx, _sessionmaker
+from types import SimpleNamespace
+from typing import Callable, Optional
 
+from sanic import Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
-async def inject_session(request):
-    request.ctx.session = _sessionmaker()
-    request.ctx.session_ctx_token = _base_model_session_ctx.set(request.ctx.session)
+from database.engine import (_base_model_session_ctx, _read_sessionmaker,
+                             _sessionmaker)
+
+
+def read_only(f: Callable) -> Callable:
+    """Помечает маршрут как читающий: его сессия берётся из пула реплики."""
+    f.is_read_only = True
+    return f
+
+
+class RequestContext(SimpleNamespace):
+    """Контекст запроса с ленивой сессией БД (реплика для @read_only)."""
+
+    _session: Optional[AsyncSession] = None
+    read_only: bool = False
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            sessionmaker = _read_sessionmaker if self.read_only else _sessionmaker
+            self._session = sessionmaker()
+            self.session_ctx_token = _base_model_session_ctx.set(self._session)
+        return self._session
+
+    @property
+    def has_session(self) -> bool:
+        return self._session is not None
+
+
+class AppRequest(Request):
+    @staticmethod
+    def make_context() -> RequestContext:
+        return RequestContext()
+
+
+def apply_session_policies(app) -> None:
+    for route in app.router.routes:
+        route.ctx.read_only = getattr(route.handler, "is_read_only", False)
+
+
+async def bind_session(request):
+    route = request.route
+    if route is not None and getattr(route.ctx, "read_only", False):
+        request.ctx.read_only = True
 
 
 async def close_session(request, response):
-    if hasattr(request.ctx, "session_ctx_token"):
+    if request.ctx.has_session:
         _base_model_session_ctx.reset(request.ctx.session_ctx_token)
         await request.ctx.session.close()
@@ -10,6 +10,16 @@ class AccountsResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AccountSummaryResponse(BaseModel):
+    account_id: int
+    incoming: Decimal10_2
+    outgoing: Decimal10_2
+    net: Decimal10_2
+    transactions_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class UserWithAccountsResponse(BaseModel):
     id: int
     full_name: str
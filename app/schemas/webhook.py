@@ -1,3 +1,5 @@
+from enum import Enum
+from typing import Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -11,3 +13,21 @@ class WebhookPayload(BaseModel):
     account_id: int
     amount: Decimal10_2
     signature: str
+
+
+class BatchItemStatus(str, Enum):
+    OK = "ok"
+    DUPLICATE = "duplicate"
+    BAD_SIGNATURE = "bad_signature"
+    INVALID = "invalid"
+    ERROR = "error"
+
+
+class BatchItemResult(BaseModel):
+    transaction_id: Optional[str] = None
+    status: BatchItemStatus
+    balance: Optional[Decimal10_2] = None
+
+
+class WebhookBatchResponse(BaseModel):
+    results: list[BatchItemResult]
@@ -0,0 +1,42 @@
+from decimal import Decimal
+from typing import Any, Iterable
+
+import orjson
+from pydantic import TypeAdapter
+from sanic.response import HTTPResponse, raw
+
+from app.schemas.account import AccountSummaryResponse, AccountsResponse
+from app.schemas.transaction import TransactionsResponse
+
+JSON_CONTENT_TYPE = "application/json"
+
+accounts_adapter = TypeAdapter(list[AccountsResponse])
+summary_adapter = TypeAdapter(list[AccountSummaryResponse])
+transactions_adapter = TypeAdapter(list[TransactionsResponse])
+transaction_adapter = TypeAdapter(TransactionsResponse)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default)
+
+
+loads = orjson.loads
+
+
+def json_list(adapter: TypeAdapter, objs: Iterable[Any], **kwargs) -> HTTPResponse:
+    """
+    Валидирует ORM-объекты/строки через готовый TypeAdapter и отдаёт
+    JSON-байты напрямую, без промежуточных dict и повторного кодирования.
+    """
+    body = adapter.dump_json(adapter.validate_python(objs, from_attributes=True))
+    return raw(body, content_type=JSON_CONTENT_TYPE, **kwargs)
+
+
+def json_line(adapter: TypeAdapter, obj: Any) -> bytes:
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
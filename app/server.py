@@ -3,15 +3,36 @@ from sanic import Sanic
 from sanic_ext import Config, Extend
 from sentry_sdk.integrations.asyncio import AsyncioIntegration
 
-from app.blueprints import api
-from app.middleware.jwt_auth import jwt_authentication
-from app.middleware.session import close_session, inject_session
-from database.models.base import Base
+from app.auth.hashing import hash_pool
+from app.blueprints import api, metrics_bp
+from app.jwt.keys import key_manager
+from app.jwt.revocation import revoked_tokens
+from app.jwt.service import REVOKED_TOKEN_TOPIC
+from app.metrics import instrument_app, timed_middleware
+from app.middleware.jwt_auth import apply_route_policies, jwt_authentication
+from app.middleware.query_stats import report_queries, track_queries
+from app.middleware.session import (AppRequest, apply_session_policies,
+                                    bind_session, close_session)
+from app.serialization import dumps, loads
+from app.services.account_cache import ACCOUNTS_TOPIC, accounts_cache
+from app.services.invalidation import invalidation_bus
+from app.services.token_sweeper import token_sweeper
+from database.engine import _sessionmaker, dispose_engines, init_engines
 from settings import settings
 
 
 def create_app() -> Sanic:
-    app = Sanic("App")
+    app = Sanic("App", request_class=AppRequest, dumps=dumps, loads=loads)
+
+    # Пул соединений у каждого воркера свой; after_*-слушатели вызываются
+    # в обратном порядке, поэтому движки закрываются последними
+    @app.listener("before_server_start")
+    async def start_engines(_):
+        init_engines()
+
+    @app.listener("after_server_stop")
+    async def stop_engines(_):
+        await dispose_engines()
 
     @app.listener("before_server_start")
     async def init_sentry(_):
@@ -23,11 +44,59 @@ def create_app() -> Sanic:
             debug=settings.debug,
         )
 
-    Extend(app, config=Config(oas=True, cors=True))
+    @app.listener("before_server_start")
+    async def start_hash_pool(_):
+        hash_pool.start()
+
+    @app.listener("after_server_stop")
+    async def stop_hash_pool(_):
+        hash_pool.shutdown()
 
-    app.register_middleware(inject_session, "request")
-    app.register_middleware(jwt_authentication, "request")
-    app.register_middleware(close_session, "response")
+    @app.listener("before_server_start")
+    async def load_jwt_keys(_):
+        key_manager.load()
+
+    async def load_revoked_tokens():
+        async with _sessionmaker() as session:
+            await revoked_tokens.load(session)
+
+    async def reset_accounts_cache():
+        accounts_cache.clear()
+
+    @app.listener("before_server_start")
+    async def start_invalidation(app):
+        invalidation_bus.subscribe(REVOKED_TOKEN_TOPIC, revoked_tokens.apply_notification)
+        invalidation_bus.subscribe(ACCOUNTS_TOPIC, accounts_cache.apply_notification)
+        invalidation_bus.on_resync(load_revoked_tokens)
+        invalidation_bus.on_resync(reset_accounts_cache)
+        await invalidation_bus.connect()
+        app.add_task(invalidation_bus.run(), name="invalidation_bus")
+
+    @app.listener("after_server_stop")
+    async def stop_invalidation(_):
+        await invalidation_bus.close()
+
+    @app.listener("after_server_start")
+    async def start_token_sweeper(app, _):
+        if settings.token_sweep_interval > 0:
+            app.add_task(token_sweeper.run(), name="token_sweeper")
+
+    @app.listener("before_server_stop")
+    async def stop_background_tasks(app):
+        # Sanic отменяет оставшиеся задачи уже после остановки event loop
+        # и ждёт их завершения без конца: отменяем свои, пока он работает
+        for name in ("token_sweeper", "invalidation_bus"):
+            await app.cancel_task(name, raise_exception=False)
+        app.purge_tasks()
+
+    Extend(app, config=Config(oas=settings.openapi_enabled, cors=True))
+
+    app.register_middleware(timed_middleware(track_queries), "request")
+    app.register_middleware(timed_middleware(bind_session), "request")
+    app.register_middleware(timed_middleware(jwt_authentication), "request")
+    app.register_middleware(timed_middleware(close_session), "response")
+    app.register_middleware(timed_middleware(report_queries), "response")
+    instrument_app(app)
 
     app.ext.openapi.add_security_scheme(
         "token",
@@ -37,20 +106,26 @@ def create_app() -> Sanic:
     )
 
     app.blueprint(api)
+    app.blueprint(metrics_bp)
 
-    @app.listener("after_server_start")
-    async def print_routes(app, _):
-        for route in app.router.routes:
-            print(f"Path: {route.path}, Methods: {route.methods}")
+    @app.listener("before_server_start")
+    async def resolve_route_policies(app):
+        apply_route_policies(app)
+        apply_session_policies(app)
 
     from app.error_handling import global_error_handler
 
     app.error_handler.add(Exception, global_error_handler)
-    print(f"Final DB URL: {settings.db_url}")
     return app
 
 
 app = create_app()
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8000, debug=settings.debug, auto_reload=settings.debug)
+    app.run(
+        host="0.0.0.0",
+        port=8000,
+        debug=settings.debug,
+        auto_reload=settings.debug,
+        workers=settings.workers,
+    )
@@ -0,0 +1,85 @@
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.account import AccountsResponse
+from app.services.invalidation import invalidation_bus
+from app.utils.cache import ExpiringLRUCache
+from settings import settings
+
+ACCOUNTS_TOPIC = "accounts"
+
+
+class AccountsFill(NamedTuple):
+    user_id: int
+    version: int
+    read_primary: bool
+
+
+class AccountsCache:
+    """Счета пользователя в памяти воркера; запись живёт ttl."""
+
+    def __init__(self, maxsize: int, ttl: float, replica_lag: float):
+        self.ttl = ttl
+        self.replica_lag = replica_lag
+        self._entries = ExpiringLRUCache(maxsize if ttl > 0 else 0)
+        # user_id -> номер последнего удаления, пока реплика могла отставать
+        self._written = ExpiringLRUCache(maxsize if ttl > 0 else 0)
+        self._version = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, user_id: int) -> Optional[list[AccountsResponse]]:
+        return self._entries.get(user_id)
+
+    def begin_fill(self, user_id: int) -> AccountsFill:
+        # После недавнего удаления читаем основную базу: реплика может ещё
+        # не видеть коммит
+        return AccountsFill(
+            user_id, self._version, self._written.get(user_id) is not None
+        )
+
+    def fill(self, fill: AccountsFill, accounts: list[AccountsResponse]) -> None:
+        # Чтение, начатое до удаления, могло получить старые балансы
+        written = self._written.get(fill.user_id)
+        if written is not None and written > fill.version:
+            return
+        self._entries.set(fill.user_id, accounts, time.time() + self.ttl)
+
+    def invalidate(self, user_id: int) -> None:
+        if not self.enabled:
+            return
+        self._version += 1
+        self._entries.pop(user_id)
+        # Номер живёт и для проверки чтений, начатых до удаления, поэтому
+        # не меньше секунды даже без реплики
+        self._written.set(
+            user_id, self._version, time.time() + max(self.replica_lag, 1.0)
+        )
+
+    def invalidate_many(self, user_ids: Iterable[int]) -> None:
+        for user_id in user_ids:
+            self.invalidate(user_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def notify(self, session: AsyncSession, user_ids: Iterable[int]) -> None:
+        """Сбрасывает записи в других воркерах после COMMIT транзакции session."""
+        user_ids = sorted(set(user_ids))
+        if self.enabled and user_ids:
+            await invalidation_bus.notify(session, ACCOUNTS_TOPIC, user_ids=user_ids)
+
+    def apply_notification(self, data: dict) -> None:
+        """Вебхуки, применённые другим воркером."""
+        self.invalidate_many(data["user_ids"])
+
+
+accounts_cache = AccountsCache(
+    maxsize=settings.accounts_cache_size,
+    ttl=settings.accounts_cache_ttl,
+    replica_lag=settings.accounts_cache_replica_lag,
+)
@@ -0,0 +1,164 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from functools import wraps
+from typing import Callable, Optional
+
+from app.metrics import admission_rejected_total
+from database.engine import pool_waits
+from settings import settings
+
+
+class AdmissionRejected(Exception):
+    """Запрос отклонён до обработчика; global_error_handler отвечает status и Retry-After."""
+
+    status = 503
+
+    def __init__(self, message: str, reason: str, retry_after: float):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class RateLimited(AdmissionRejected):
+    status = 429
+
+
+class RateLimiter:
+    """Token bucket на IP источника, не больше maxsize корзин."""
+
+    def __init__(self, rate: float, burst: int, maxsize: int):
+        if rate > 0 and burst < 1:
+            raise ValueError("Rate limit burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, key: str) -> None:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1
+
+        # Отказ тоже обновляет корзину, поэтому вытеснение на любой вставке
+        self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+        if len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+
+        if not allowed:
+            raise RateLimited(
+                "Rate limit exceeded", "rate_limit", (1 - tokens) / self.rate
+            )
+
+
+class AdmissionController:
+    """Лимит одновременных обработчиков с ограниченной очередью FIFO."""
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        pool_wait_threshold: float,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.pool_wait_threshold = pool_wait_threshold
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def _check_pool(self) -> None:
+        if self.pool_wait_threshold <= 0:
+            return
+        # Иначе запрос встанет в очередь пула и займёт воркер до pool_timeout
+        wait = pool_waits["primary"].current()
+        if wait > self.pool_wait_threshold:
+            raise AdmissionRejected("Database is overloaded", "pool_wait", wait)
+
+    async def acquire(self) -> None:
+        self._check_pool()
+
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionRejected("Service busy", "queue_full", self.queue_timeout)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            # Запрос отменён: слот, если уже передан, возвращаем
+            if waiter.done():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+
+        # Слот передаётся в release(): in_flight уже учитывает этот запрос
+        if not waiter.done():
+            self._discard(waiter)
+            raise AdmissionRejected("Service busy", "queue_timeout", self.queue_timeout)
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        self._waiters.remove(waiter)
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+def admission_control(
+    controller: AdmissionController, limiter: Optional[RateLimiter] = None
+):
+    """Пропускает запрос к обработчику через limiter (по IP) и controller."""
+
+    def decorator(f: Callable):
+        @wraps(f)
+        async def decorated_function(request, *args, **kwargs):
+            try:
+                if limiter is not None and limiter.enabled:
+                    limiter.acquire(request.remote_addr or request.ip)
+                await controller.acquire()
+            except AdmissionRejected as e:
+                admission_rejected_total.inc(e.reason)
+                raise
+
+            try:
+                return await f(request, *args, **kwargs)
+            finally:
+                controller.release()
+
+        return decorated_function
+
+    return decorator
+
+
+webhook_admission = AdmissionController(
+    max_in_flight=settings.webhook_max_in_flight,
+    max_queue=settings.webhook_max_queue,
+    queue_timeout=settings.webhook_queue_timeout,
+    pool_wait_threshold=settings.webhook_pool_wait_threshold,
+)
+
+webhook_rate_limiter = RateLimiter(
+    rate=settings.webhook_rate_limit,
+    burst=settings.webhook_rate_burst,
+    maxsize=settings.webhook_rate_limit_clients,
+)
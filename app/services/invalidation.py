@@ -0,0 +1,114 @@
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.logger import LOGS
+from app.serialization import dumps, loads
+from settings import settings
+
+
+class InvalidationBus:
+    """Рассылка изменений состояния в памяти между воркерами через LISTEN/NOTIFY."""
+
+    def __init__(self, channel: str, keepalive: float, enabled: bool = True):
+        self.channel = channel
+        self.keepalive = keepalive
+        # Без других воркеров рассылать некому: ни pg_notify, ни LISTEN
+        self.enabled = enabled
+        self.sender = uuid.uuid4().hex
+        self._handlers: dict[str, Callable[[dict], None]] = {}
+        self._resync: list[Callable[[], Awaitable[None]]] = []
+        self._connection: Optional[asyncpg.Connection] = None
+
+    def subscribe(self, topic: str, handler: Callable[[dict], None]) -> None:
+        self._handlers[topic] = handler
+
+    def on_resync(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._resync.append(callback)
+
+    async def notify(self, session: AsyncSession, topic: str, **data: Any) -> None:
+        if not self.enabled:
+            return
+        # В транзакции изменения: Postgres доставит сообщение только после COMMIT
+        await session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {
+                "channel": self.channel,
+                "payload": dumps(
+                    {"topic": topic, "sender": self.sender, "data": data}
+                ).decode(),
+            },
+        )
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            message = loads(payload)
+            # Своё изменение воркер уже применил сам
+            if message["sender"] == self.sender:
+                return
+            handler = self._handlers.get(message["topic"])
+            if handler is not None:
+                handler(message["data"])
+        except Exception as e:
+            LOGS.error("Invalidation message %r failed: %s", payload, e)
+
+    async def connect(self) -> None:
+        """Подписывается на канал, затем вызывает обработчики resync."""
+        if not self.enabled:
+            for callback in self._resync:
+                await callback()
+            return
+
+        connection = await asyncpg.connect(
+            host=settings.host,
+            port=settings.port,
+            user=settings.user,
+            password=settings.password.get_secret_value(),
+            database=settings.db,
+        )
+        try:
+            # Сначала LISTEN: изменение до конца resync придёт сообщением,
+            # а пропущенное без соединения восстановит resync
+            await connection.add_listener(self.channel, self._on_notification)
+            for callback in self._resync:
+                await callback()
+        except BaseException:
+            await connection.close()
+            raise
+        self._connection = connection
+
+    async def close(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close(timeout=self.keepalive)
+
+    async def run(self) -> None:
+        """Проверяет соединение раз в keepalive секунд и переподключается."""
+        if not self.enabled:
+            return
+        while True:
+            await asyncio.sleep(self.keepalive)
+            try:
+                if self._connection is None or self._connection.is_closed():
+                    await self.connect()
+                    LOGS.info("Invalidation listener reconnected")
+                else:
+                    await self._connection.execute("SELECT 1", timeout=self.keepalive)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGS.warning("Invalidation listener lost connection: %s", e)
+                if self._connection is not None:
+                    self._connection.terminate()
+                    self._connection = None
+
+
+invalidation_bus = InvalidationBus(
+    channel=settings.invalidation_channel,
+    keepalive=settings.invalidation_keepalive,
+    enabled=settings.workers > 1,
+)
@@ -1,4 +1,7 @@
-from sqlalchemy import select
+from typing import Optional
+
+from sqlalchemy import Select, Text, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models.account import Account
@@ -20,14 +23,26 @@ class UserService:
         await session.refresh(new_user)
         return new_user
 
+    @staticmethod
+    def user_query(user_id: int) -> Select:
+        return select(User).where(User.id == user_id)
+
+    @staticmethod
+    def user_by_email_query(email: str) -> Select:
+        return select(User).where(User.email == email)
+
+    @staticmethod
+    def user_accounts_query(user_id: int) -> Select:
+        return select(Account).filter_by(user_id=user_id).order_by(Account.id)
+
     @staticmethod
     async def get_user(user_id: int, session: AsyncSession) -> User:
-        user = await session.get(User, user_id)
+        user = await session.scalar(UserService.user_query(user_id))
         return user
 
     @staticmethod
     async def get_by_email(email: str, session: AsyncSession):
-        user = await session.execute(select(User).where(User.email == email))
+        user = await session.execute(UserService.user_by_email_query(email))
         return user.scalar_one_or_none()
 
     @staticmethod
@@ -43,3 +58,29 @@ class UserService:
             }
             for account in accounts
         ]
+
+    @staticmethod
+    def users_with_accounts_json_query(after_id: Optional[int] = None) -> Select:
+        """Пользователи со счетами, собранные в JSON (колонка data) в Postgres."""
+        account_json = func.json_build_object(
+            "id", Account.id, "balance", cast(Account.balance, Text)
+        )
+        accounts_json = func.coalesce(
+            func.json_agg(aggregate_order_by(account_json, Account.id)).filter(
+                Account.id.is_not(None)
+            ),
+            literal_column("'[]'::json"),
+        )
+        user_json = func.json_build_object(
+            "id", User.id, "full_name", User.full_name, "accounts", accounts_json
+        )
+
+        query = (
+            select(User.id, cast(user_json, Text).label("data"))
+            .outerjoin(Account, Account.user_id == User.id)
+            .group_by(User.id)
+            .order_by(User.id)
+        )
+        if after_id is not None:
+            query = query.where(User.id > after_id)
+        return query
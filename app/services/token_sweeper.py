@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import ColumnElement, Delete, delete, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.logger import LOGS
+from database.engine import _sessionmaker
+from database.models.token import RefreshToken, RevokedToken
+from database.partitions import (create_partition_sql, list_partitions_sql,
+                                 partition_day)
+from settings import settings
+
+
+class TokenSweeper:
+    """Фоновая очистка истёкших revokedtokens и refreshtokens пачками."""
+
+    lock_key = 0x746F6B656E  # "token"
+
+    def __init__(
+        self,
+        interval: float,
+        batch_size: int,
+        batch_pause: float,
+        partitioned: bool = False,
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.partitioned = partitioned
+
+    @staticmethod
+    def delete_expired_query(
+        model, expired: ColumnElement[bool], batch_size: int
+    ) -> Delete:
+        return delete(model).where(
+            model.id.in_(select(model.id).where(expired).limit(batch_size))
+        )
+
+    async def delete_expired(self, model, expired: ColumnElement[bool]) -> int:
+        total = 0
+        while True:
+            async with _sessionmaker() as session, session.begin():
+                result = await session.execute(
+                    self.delete_expired_query(model, expired, self.batch_size)
+                )
+            total += result.rowcount
+            if result.rowcount < self.batch_size:
+                return total
+            await asyncio.sleep(self.batch_pause)
+
+    async def rotate_partitions(self) -> int:
+        """
+        :return: количество удалённых партиций
+        """
+        today = datetime.now(timezone.utc).date()
+        horizon = settings.jwt_refresh_token_expiration // 86400 + 1
+        dropped = 0
+
+        async with _sessionmaker() as session, session.begin():
+            for offset in range(horizon + 1):
+                await session.execute(
+                    text(create_partition_sql(today + timedelta(days=offset)))
+                )
+
+            names = (await session.scalars(text(list_partitions_sql()))).all()
+            for name in names:
+                day = partition_day(name)
+                # Партиция покрывает [day, day + 1): после этого все её записи истекли
+                if day is not None and day < today:
+                    await session.execute(text(f"DROP TABLE {name}"))
+                    dropped += 1
+
+        return dropped
+
+    async def sweep(self) -> Optional[dict[str, int]]:
+        """
+        :return: статистика прохода или None, если проход уже идёт в другом воркере
+        """
+        async with _sessionmaker() as lock_session:
+            # Блокировка уровня сессии на соединении без транзакции:
+            # не держим idle in transaction на время всего прохода
+            lock = await lock_session.connection(
+                execution_options={"isolation_level": "AUTOCOMMIT"}
+            )
+            try:
+                locked = await lock.scalar(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+                )
+            except BaseException:
+                # Запрос мог взять блокировку до отмены или обрыва
+                await lock.invalidate()
+                raise
+            if not locked:
+                return None
+            try:
+                stats = {}
+                if self.partitioned:
+                    stats["revoked_partitions"] = await self.rotate_partitions()
+                stats["revoked"] = await self.delete_expired(
+                    RevokedToken, RevokedToken.is_expired
+                )
+                stats["refresh"] = await self.delete_expired(
+                    RefreshToken, ~RefreshToken.is_active
+                )
+                return stats
+            finally:
+                await self.unlock(lock)
+
+    async def unlock(self, lock: AsyncConnection) -> None:
+        """Снимает advisory-блокировку; при неудаче закрывает соединение."""
+        try:
+            unlocked = await lock.scalar(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key}
+            )
+        except Exception as e:
+            LOGS.warning("Token sweep lock release failed: %s", e)
+            unlocked = False
+        except BaseException:
+            await lock.invalidate()
+            raise
+        if not unlocked:
+            # Иначе соединение вернётся в пул с блокировкой, и очистка не
+            # запустится ни в одном воркере
+            await lock.invalidate()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                stats = await self.sweep()
+                if stats is None:
+                    LOGS.debug("Token sweep skipped: running in another worker")
+                else:
+                    LOGS.info("Token sweep finished: %s", stats)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGS.error("Token sweep failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+
+token_sweeper = TokenSweeper(
+    interval=settings.token_sweep_interval,
+    batch_size=settings.token_sweep_batch_size,
+    batch_pause=settings.token_sweep_batch_pause,
+    partitioned=settings.revoked_tokens_partitioned,
+)
@@ -0,0 +1,223 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, NamedTuple, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import Date, Select, cast, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.webhook import WebhookPayload
+from app.services.account_cache import accounts_cache
+from app.utils.cache import LRUSet
+from database.models.account import Account
+from database.models.rollup import AccountDailyRollup
+from database.models.transaction import Transaction
+from settings import settings
+
+
+class BatchResult(NamedTuple):
+    # id вставленной транзакции -> баланс счёта сразу после неё (в порядке
+    # пачки); дубликатов здесь нет
+    balances: dict[UUID, Decimal]
+    # Владельцы затронутых счетов: по ним сбрасывается кэш /user/accounts
+    owners: set[int]
+
+
+class TransactionService:
+    @staticmethod
+    def user_transactions_query(
+        user_id: int, after: Optional[tuple[datetime, UUID]] = None
+    ) -> Select:
+        query = (
+            select(
+                Transaction.id,
+                Transaction.created_at,
+                Transaction.account_id,
+                Transaction.amount,
+            )
+            .where(Transaction.user_id == user_id)
+            .order_by(Transaction.created_at, Transaction.id)
+        )
+        if after:
+            query = query.where(
+                tuple_(Transaction.created_at, Transaction.id) > tuple_(*after)
+            )
+        return query
+
+    @staticmethod
+    def account_summary_query(user_id: int, start: date, end: date) -> Select:
+        """Обороты по счетам пользователя за дни [start, end] из дневных сводок."""
+        incoming = func.sum(AccountDailyRollup.incoming)
+        outgoing = func.sum(AccountDailyRollup.outgoing)
+        return (
+            select(
+                AccountDailyRollup.account_id,
+                incoming.label("incoming"),
+                outgoing.label("outgoing"),
+                (incoming - outgoing).label("net"),
+                func.sum(AccountDailyRollup.transactions_count).label(
+                    "transactions_count"
+                ),
+            )
+            .join(Account, Account.id == AccountDailyRollup.account_id)
+            .where(Account.user_id == user_id)
+            .where(AccountDailyRollup.day.between(start, end))
+            .group_by(AccountDailyRollup.account_id)
+            .order_by(AccountDailyRollup.account_id)
+        )
+
+    @staticmethod
+    def apply_batch_query(rows: list[dict]) -> Select:
+        """Транзакции пачки, upsert счетов и дневных сводок одним запросом."""
+        inserted = (
+            insert(Transaction)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[Transaction.id])
+            .returning(
+                Transaction.id,
+                Transaction.user_id,
+                Transaction.account_id,
+                Transaction.amount,
+                Transaction.created_at,
+            )
+            .cte("inserted")
+        )
+
+        # Порядок по id задаёт порядок блокировок счетов между параллельными пачками
+        deltas = (
+            select(
+                inserted.c.account_id,
+                func.min(inserted.c.user_id),
+                func.sum(inserted.c.amount),
+            )
+            .group_by(inserted.c.account_id)
+            .order_by(inserted.c.account_id)
+        )
+        account_upsert = insert(Account).from_select(
+            ["id", "user_id", "balance"], deltas
+        )
+        balances = (
+            account_upsert.on_conflict_do_update(
+                index_elements=[Account.id],
+                set_={
+                    "balance": Account.balance + account_upsert.excluded.balance,
+                    "updated_at": func.now(),
+                },
+            )
+            .returning(Account.id, Account.user_id, Account.balance)
+            .cte("balances")
+        )
+
+        amount = inserted.c.amount
+        day = cast(func.timezone("UTC", inserted.c.created_at), Date)
+        daily = (
+            select(
+                inserted.c.account_id,
+                day,
+                func.coalesce(func.sum(amount).filter(amount > 0), 0),
+                func.coalesce(-func.sum(amount).filter(amount < 0), 0),
+                func.count(),
+            )
+            .group_by(inserted.c.account_id, day)
+            .order_by(inserted.c.account_id, day)
+        )
+        rollup_upsert = insert(AccountDailyRollup).from_select(
+            ["account_id", "day", "incoming", "outgoing", "transactions_count"], daily
+        )
+        # Не участвует в выборке, но выполняется вместе с ней: изменяющие CTE
+        # Postgres доводит до конца, даже если на них не ссылаются
+        rollups = rollup_upsert.on_conflict_do_update(
+            index_elements=[AccountDailyRollup.account_id, AccountDailyRollup.day],
+            set_={
+                "incoming": AccountDailyRollup.incoming + rollup_upsert.excluded.incoming,
+                "outgoing": AccountDailyRollup.outgoing + rollup_upsert.excluded.outgoing,
+                "transactions_count": (
+                    AccountDailyRollup.transactions_count
+                    + rollup_upsert.excluded.transactions_count
+                ),
+                "updated_at": func.now(),
+            },
+        ).cte("rollups")
+
+        return (
+            select(
+                inserted.c.id,
+                balances.c.user_id,
+                balances.c.id,
+                balances.c.balance,
+            )
+            .join(balances, balances.c.id == inserted.c.account_id)
+            .add_cte(rollups)
+        )
+
+    @staticmethod
+    async def apply_batch(
+        payloads: Iterable[WebhookPayload], session: AsyncSession
+    ) -> BatchResult:
+        """Применяет пачку вебхуков одним запросом в текущей транзакции сессии."""
+        rows = {}
+        for payload in payloads:
+            rows.setdefault(
+                payload.transaction_id,
+                {
+                    "id": payload.transaction_id,
+                    "user_id": payload.user_id,
+                    "account_id": payload.account_id,
+                    "amount": payload.amount,
+                    "signature": payload.signature,
+                },
+            )
+        if not rows:
+            return BatchResult({}, set())
+
+        result = await session.execute(
+            TransactionService.apply_batch_query(list(rows.values()))
+        )
+
+        batch = BatchResult({}, set())
+        inserted_ids = set()
+        running = {}
+        for transaction_id, owner_id, account_id, balance in result:
+            inserted_ids.add(transaction_id)
+            batch.owners.add(owner_id)
+            running[account_id] = balance
+
+        # Баланс после каждой транзакции: от итогового назад по пачке
+        for row in reversed(rows.values()):
+            if row["id"] in inserted_ids:
+                batch.balances[row["id"]] = running[row["account_id"]]
+                running[row["account_id"]] -= row["amount"]
+
+        # user_id вебхука может не совпадать с владельцем счёта, а кэш
+        # хранит счета владельца. Второй запрос после CTE, только при
+        # WORKERS > 1: владельцы известны лишь из его результата
+        await accounts_cache.notify(session, batch.owners)
+
+        return batch
+
+    @staticmethod
+    async def apply_each(
+        payloads: Iterable[WebhookPayload], session: AsyncSession
+    ) -> list[Union[BatchResult, DBAPIError]]:
+        """
+        Применяет вебхуки по одному, каждый в своей транзакции.
+        :return: результат или ошибка для каждого вебхука по порядку
+        """
+        results = []
+        for payload in payloads:
+            try:
+                async with session.begin():
+                    results.append(
+                        await TransactionService.apply_batch([payload], session)
+                    )
+            except DBAPIError as e:
+                # Запасной путь после ошибки пачки: ошибка базы на одном
+                # вебхуке (например, user_id без пользователя) не отказывает
+                # остальным
+                results.append(e)
+        return results
+
+
+recent_transaction_ids = LRUSet(settings.webhook_recent_ids_size)
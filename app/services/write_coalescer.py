@@ -0,0 +1,107 @@
+import asyncio
+import contextvars
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy.exc import DBAPIError
+
+from app.logger import LOGS
+from app.schemas.webhook import WebhookPayload
+from app.services.account_cache import accounts_cache
+from app.services.transaction_service import TransactionService
+from database.engine import _sessionmaker
+from settings import settings
+
+
+class _PendingBatch:
+    __slots__ = ("items", "timer")
+
+    def __init__(self):
+        self.items: list[tuple[WebhookPayload, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class AccountWriteCoalescer:
+    """Склеивает вебхуки одного счёта за короткое окно в одну транзакцию."""
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: dict[int, _PendingBatch] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, payload: WebhookPayload) -> Optional[Decimal]:
+        """
+        :return: баланс счёта сразу после этой транзакции или None для дубликата
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self._pending.get(payload.account_id)
+        if batch is None:
+            batch = self._pending[payload.account_id] = _PendingBatch()
+            batch.timer = loop.call_later(
+                self.window, self._schedule_flush, payload.account_id, batch
+            )
+
+        batch.items.append((payload, future))
+        if len(batch.items) >= self.max_batch:
+            batch.timer.cancel()
+            self._schedule_flush(payload.account_id, batch)
+
+        return await future
+
+    def _schedule_flush(self, account_id: int, batch: _PendingBatch) -> None:
+        if self._pending.get(account_id) is batch:
+            del self._pending[account_id]
+
+        # Общая запись не принадлежит ни одному HTTP-запросу: пустой контекст,
+        # чтобы её SQL не попал в статистику запроса, открывшего окно
+        task = asyncio.get_running_loop().create_task(
+            self._flush(batch), context=contextvars.Context()
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch: _PendingBatch) -> None:
+        payloads = [payload for payload, _ in batch.items]
+        try:
+            async with _sessionmaker() as session:
+                try:
+                    async with session.begin():
+                        result = await TransactionService.apply_batch(
+                            payloads, session
+                        )
+                    results = [result] * len(payloads)
+                except DBAPIError as e:
+                    LOGS.warning(
+                        "Coalesced batch of %d failed, applying one by one: %s",
+                        len(payloads), e,
+                    )
+                    results = await TransactionService.apply_each(payloads, session)
+        except Exception as e:
+            for _, future in batch.items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        owners = set()
+        for (payload, future), result in zip(batch.items, results):
+            if isinstance(result, Exception):
+                if not future.done():
+                    future.set_exception(result)
+                continue
+
+            owners.update(result.owners)
+            # Повтор того же id внутри окна получит duplicate
+            balance = result.balances.pop(payload.transaction_id, None)
+            if not future.done():
+                future.set_result(balance)
+
+        accounts_cache.invalidate_many(owners)
+
+
+webhook_coalescer = AccountWriteCoalescer(
+    window=settings.webhook_coalesce_window_ms / 1000,
+    max_batch=settings.webhook_coalesce_max_batch,
+)
@@ -1,14 +1,57 @@
 import hashlib
-from typing import Any, Dict
+import hmac
+import time
+from typing import Any, Dict, Iterable, List
 
+from app.metrics import signature_verify_seconds
+from app.schemas.webhook import WebhookPayload
 from settings import settings
 
+LEGACY_SCHEME = "legacy"
+HMAC_SHA256_SCHEME = "hmac-sha256"
+
+# Порядок полей фиксирован схемой вебхука, а не сортировкой ключей на каждый вызов
+SIGNED_FIELDS = tuple(
+    name for name in WebhookPayload.model_fields if name != "signature"
+)
+
+
+class HmacSigner:
+    """HMAC-SHA256 с ключевым контекстом, вычисленным один раз."""
+
+    def __init__(self, secret_key: str):
+        self._keyed = hmac.new(secret_key.encode(), digestmod=hashlib.sha256)
+
+    def sign(self, data: Dict[str, Any]) -> str:
+        mac = self._keyed.copy()
+        mac.update("|".join(str(data[field]) for field in SIGNED_FIELDS).encode())
+        return mac.hexdigest()
+
+
+_default_secret_key = settings.secret_key.get_secret_value()
+_default_signer = HmacSigner(_default_secret_key)
+
+
+def _get_signer(secret_key: str) -> HmacSigner:
+    if secret_key == _default_secret_key:
+        return _default_signer
+    return HmacSigner(secret_key)
+
+
+def _signatures_match(received: Any, expected: str) -> bool:
+    return hmac.compare_digest(str(received).encode(), expected.encode())
+
 
 class TransactionSignatureService:
     @staticmethod
     def generate_signature(
-        data: Dict[str, Any], secret_key: str = settings.secret_key.get_secret_value()
+        data: Dict[str, Any],
+        secret_key: str = _default_secret_key,
+        scheme: str = settings.signature_scheme,
     ) -> str:
+        if scheme == HMAC_SHA256_SCHEME:
+            return _get_signer(secret_key).sign(data)
+
         data = data.copy()
         data.pop("signature", None)
 
@@ -19,11 +62,43 @@ class TransactionSignatureService:
 
     @staticmethod
     def verify_signature(
-        data: Dict[str, Any], secret_key: str = settings.secret_key.get_secret_value()
+        data: Dict[str, Any],
+        secret_key: str = _default_secret_key,
+        scheme: str = settings.signature_scheme,
     ) -> bool:
-        received_signature = data["signature"]
-        expected_signature = TransactionSignatureService.generate_signature(
-            data, secret_key
-        )
+        started = time.perf_counter()
+        try:
+            received_signature = data["signature"]
+            expected_signature = TransactionSignatureService.generate_signature(
+                data, secret_key, scheme
+            )
+
+            return _signatures_match(received_signature, expected_signature)
+        finally:
+            signature_verify_seconds.observe(time.perf_counter() - started, "single")
+
+    @staticmethod
+    def verify_many(
+        items: Iterable[Any],
+        secret_key: str = _default_secret_key,
+        scheme: str = settings.signature_scheme,
+    ) -> List[bool]:
+        """Проверяет подписи пачки; некорректный элемент считается неподписанным."""
+        if scheme == HMAC_SHA256_SCHEME:
+            sign = _get_signer(secret_key).sign
+        else:
+            def sign(data):
+                return TransactionSignatureService.generate_signature(
+                    data, secret_key, scheme
+                )
+
+        started = time.perf_counter()
+        results = []
+        for item in items:
+            try:
+                results.append(_signatures_match(item["signature"], sign(item)))
+            except (KeyError, TypeError, AttributeError):
+                results.append(False)
 
-        return received_signature == expected_signature
+        signature_verify_seconds.observe(time.perf_counter() - started, "batch")
+        return results
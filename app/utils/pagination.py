@@ -0,0 +1,53 @@
+import base64
+import binascii
+from typing import Callable
+
+from sqlalchemy import Row, Select
+
+from database.engine import _read_sessionmaker
+from settings import settings
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+def encode_cursor(*parts) -> str:
+    raw = "|".join(str(part) for part in parts)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list[str]:
+    try:
+        return base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_limit(request) -> int:
+    limit = int(request.args.get("limit", settings.page_default_limit))
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, settings.page_max_limit)
+
+
+def wants_ndjson(request) -> bool:
+    return (
+        request.args.get("format") == "ndjson"
+        or NDJSON_CONTENT_TYPE in request.headers.get("accept", "")
+    )
+
+
+async def stream_ndjson(
+    request, query: Select, render: Callable[[Row], bytes]
+) -> None:
+    # Ответ отправляется до закрытия курсора, а response-middleware срабатывает
+    # уже на request.respond(), поэтому у стрима своя сессия
+    async with _read_sessionmaker() as session:
+        result = await session.stream(
+            query.execution_options(yield_per=settings.stream_chunk_size)
+        )
+        response = await request.respond(content_type=NDJSON_CONTENT_TYPE)
+
+        async for rows in result.partitions():
+            await response.send(b"".join(render(row) + b"\n" for row in rows))
+
+    await response.eof()
@@ -1,32 +1,198 @@
+"""
+Нагрузочный генератор вебхуков платёжной системы.
+
+Шлёт подписанные вебхуки в /api/webhook/transaction через общий пул
+соединений aiohttp: новые транзакции, повторы уже отправленных и
+запросы с неверной подписью в заданной пропорции. Счета выбираются
+равномерно или по Zipf (несколько «горячих» счетов получают большую
+часть трафика). Все запросы генерируются и подписываются до старта,
+поэтому подпись не отнимает время у отправки.
+
+При заданном --rps задержка считается от запланированного момента
+отправки, а не от фактического: если сервер не успевает, рост очереди
+виден в перцентилях, а не прячется за замедлившимся генератором.
+
+Весь трафик идёт с одного IP: для замера пропускной способности
+лимит сервера на IP должен быть выключен (WEBHOOK_RATE_LIMIT=0, по
+умолчанию), иначе прогон измерит ответы 429.
+
+Запуск: python -m app.utils.webhook_emulator --requests 5000 --concurrency 64 --rps 500
+"""
+import argparse
 import asyncio
+import bisect
+import itertools
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
 
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
 
-from app.logger import LOGS
+from app.serialization import dumps
 from app.signature.signature_service import TransactionSignatureService
+from settings import settings
+
+NEW = "new"
+DUPLICATE = "duplicate"
+BAD_SIGNATURE = "bad_signature"
+
+EXPECTED_STATUS = {NEW: 200, DUPLICATE: 409, BAD_SIGNATURE: 403}
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
 
+def account_picker(args, rng: random.Random):
+    accounts = range(args.account_offset, args.account_offset + args.accounts)
+    if args.distribution == "uniform":
+        return lambda: rng.choice(accounts)
 
-async def send_webhook():
-    data = {
-        "transaction_id": "5eae174f-7cd0-472c-bd36-35660f001123",
-        "user_id": 1,
-        "account_id": 2,
-        "amount": 100,
-    }
-    url = "http://localhost:8000/api/webhook/transaction"
+    cum_weights = list(
+        itertools.accumulate(1 / rank ** args.zipf_s for rank in range(1, args.accounts + 1))
+    )
+    return lambda: rng.choices(accounts, cum_weights=cum_weights)[0]
 
-    generated_signature = TransactionSignatureService.generate_signature(data)
-    data["signature"] = generated_signature
 
-    async with ClientSession() as session:
-        async with session.post(url, json=data) as response:
-            response_data = await response.json()
+def build_requests(args) -> list[tuple[str, bytes]]:
+    rng = random.Random(args.seed)
+    pick_account = account_picker(args, rng)
+    sent: list[bytes] = []
+    requests = []
 
-        if response.status != 200:
-            LOGS.error(f"Ошибка: {response.status}, {response_data}")
+    for _ in range(args.requests):
+        roll = rng.random()
+        # Повторяем только то, что ушло не меньше --concurrency запросов назад,
+        # иначе дубликат может обогнать оригинал
+        if roll < args.duplicate_ratio and len(sent) > args.concurrency:
+            requests.append((DUPLICATE, sent[rng.randrange(len(sent) - args.concurrency)]))
+            continue
+
+        data = {
+            # id всегда новые: повторный прогон не должен упираться в дубликаты
+            "transaction_id": str(uuid.uuid4()),
+            "user_id": args.user_id,
+            "account_id": pick_account(),
+            "amount": args.amount,
+        }
+        data["signature"] = TransactionSignatureService.generate_signature(
+            data, args.secret_key, args.scheme
+        )
+
+        if roll < args.duplicate_ratio + args.bad_signature_ratio:
+            data["signature"] = data["signature"][::-1]
+            requests.append((BAD_SIGNATURE, dumps(data)))
         else:
-            LOGS.info(f"Успешно: {response_data}")
+            body = dumps(data)
+            sent.append(body)
+            requests.append((NEW, body))
+
+    return requests
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def print_report(
+    elapsed: float,
+    latencies: dict[str, list[float]],
+    statuses: Counter,
+    errors: Counter,
+) -> None:
+    total = sum(len(values) for values in latencies.values())
+    print(f"requests: {total}, elapsed: {elapsed:.2f}s, throughput: {total / elapsed:.0f} req/s")
+
+    print(f"\n{'kind':<16}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    everything = sorted(itertools.chain.from_iterable(latencies.values()))
+    for kind, values in [*sorted(latencies.items()), ("all", everything)]:
+        values = sorted(values)
+        print(
+            f"{kind:<16}{len(values):>8}"
+            + "".join(f"{percentile(values, pct):>10.1f}" for pct in (50, 95, 99))
+            + f"{(values[-1] if values else 0):>10.1f}"
+        )
+
+    print("\nlatency histogram (ms):")
+    buckets = Counter(
+        bisect.bisect_left(HISTOGRAM_BOUNDS_MS, value) for value in everything
+    )
+    for index, bound in enumerate((*HISTOGRAM_BOUNDS_MS, float("inf"))):
+        count = buckets.get(index, 0)
+        bar = "#" * round(50 * count / total) if total else ""
+        print(f"  <= {bound:>6} {count:>8} {bar}")
+
+    print("\nstatuses:")
+    for (kind, status), count in sorted(statuses.items()):
+        mark = "" if status == EXPECTED_STATUS[kind] else "  (unexpected)"
+        print(f"  {kind:<16}{status:>5}{count:>8}{mark}")
+    for error, count in errors.items():
+        print(f"  error {error}: {count}")
+
+
+async def run(args) -> None:
+    requests = build_requests(args)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    queue = iter(enumerate(requests))
+    interval = 1 / args.rps if args.rps else 0.0
+
+    connector = TCPConnector(limit=args.concurrency)
+    timeout = ClientTimeout(total=args.timeout)
+    headers = {"Content-Type": "application/json"}
+
+    async with ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+        started = time.perf_counter()
+
+        async def worker():
+            for index, (kind, body) in queue:
+                if interval:
+                    scheduled = started + index * interval
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                else:
+                    scheduled = time.perf_counter()
+
+                try:
+                    async with session.post(args.url, data=body) as response:
+                        await response.read()
+                        statuses[kind, response.status] += 1
+                except Exception as e:
+                    errors[type(e).__name__] += 1
+                    continue
+                latencies[kind].append((time.perf_counter() - scheduled) * 1000)
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    print_report(elapsed, latencies, statuses, errors)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", default="http://localhost:8000/api/webhook/transaction")
+    parser.add_argument("--requests", type=int, default=1000, help="всего запросов")
+    parser.add_argument("--concurrency", type=int, default=32, help="одновременных соединений")
+    parser.add_argument("--rps", type=float, default=0, help="целевой RPS, 0 — без ограничения")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.05)
+    parser.add_argument("--bad-signature-ratio", type=float, default=0.01)
+    parser.add_argument("--distribution", choices=("uniform", "zipf"), default="uniform")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="показатель Zipf")
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--account-offset", type=int, default=1000, help="id первого счёта")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--amount", default="1.00")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--secret-key", default=settings.secret_key.get_secret_value())
+    parser.add_argument("--scheme", default=settings.signature_scheme)
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    asyncio.run(send_webhook())
+    asyncio.run(run(parse_args()))
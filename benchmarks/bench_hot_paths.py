@@ -0,0 +1,199 @@
+"""
+Микробенчмарки функций, которые выполняются на каждый запрос: JWT,
+подписи вебхуков, валидаторы Decimal10_2, WebhookPayload и
+model_validate схем ответов. База данных не нужна, но нужен .env
+с ключами JWT, как для самого приложения.
+
+Запуск:
+    python -m benchmarks.bench_hot_paths --save baseline.json
+    python -m benchmarks.bench_hot_paths --compare baseline.json [--threshold 0.1]
+
+В режиме сравнения код выхода 1, если хоть один кейс медленнее
+базового более чем на --threshold.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Callable, Coroutine
+
+from app.jwt.service import (create_jwt_token, decode_jwt_token,
+                             verified_tokens)
+from app.schemas.account import AccountsResponse, UserWithAccountsResponse
+from app.schemas.auth import LogoutResponse, TokenResponse
+from app.schemas.transaction import TransactionsResponse
+from app.schemas.types import convert_to_decimal, validate_decimal
+from app.schemas.user import UserResponse
+from app.schemas.webhook import WebhookBatchResponse, WebhookPayload
+from app.signature.signature_service import (HMAC_SHA256_SCHEME, LEGACY_SCHEME,
+                                             TransactionSignatureService)
+
+
+def drive(coro: Coroutine) -> Any:
+    """
+    Выполняет корутину, которая не уходит в ожидание, без event loop:
+    иначе в замер попадает стоимость цикла, а не самой функции.
+    """
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("Coroutine suspended, benchmark needs a loop")
+
+
+def make_cases() -> dict[str, Callable[[], Any]]:
+    user_data = {
+        "user_id": 1,
+        "full_name": "Test User",
+        "email": "user@example.com",
+        "role": "user",
+    }
+    access_token = create_jwt_token(user_data)
+
+    webhook = {
+        "transaction_id": str(uuid.uuid4()),
+        "user_id": 1,
+        "account_id": 1,
+        "amount": "100.00",
+    }
+    signed = {
+        scheme: {
+            **webhook,
+            "signature": TransactionSignatureService.generate_signature(
+                webhook, scheme=scheme
+            ),
+        }
+        for scheme in (LEGACY_SCHEME, HMAC_SHA256_SCHEME)
+    }
+
+    account = SimpleNamespace(id=1, balance=Decimal("100.00"))
+    user = SimpleNamespace(
+        id=1, email="user@example.com", full_name="Test User", accounts=[account] * 3
+    )
+    transaction = SimpleNamespace(account_id=1, amount=Decimal("12.30"))
+    token = {
+        "access_token": access_token,
+        "refresh_token": access_token,
+        "token_type": "bearer",
+        "expires_in": 900,
+    }
+    batch = {
+        "results": [
+            {"transaction_id": webhook["transaction_id"], "status": "ok", "balance": "1.00"}
+        ] * 10
+    }
+
+    return {
+        "jwt.create_access": lambda: create_jwt_token(user_data),
+        "jwt.decode_access.cached": lambda: drive(decode_jwt_token(access_token)),
+        "jwt.decode_access.verify": lambda: (
+            verified_tokens.clear(), drive(decode_jwt_token(access_token))
+        ),
+        **{
+            f"signature.generate.{scheme}": (
+                lambda data=data, scheme=scheme:
+                TransactionSignatureService.generate_signature(data, scheme=scheme)
+            )
+            for scheme, data in signed.items()
+        },
+        **{
+            f"signature.verify.{scheme}": (
+                lambda data=data, scheme=scheme:
+                TransactionSignatureService.verify_signature(data, scheme=scheme)
+            )
+            for scheme, data in signed.items()
+        },
+        "decimal.convert.str": lambda: convert_to_decimal("100.5"),
+        "decimal.convert.int": lambda: convert_to_decimal(100),
+        "decimal.convert.decimal": lambda: convert_to_decimal(Decimal("100.50")),
+        "decimal.validate": lambda: validate_decimal(Decimal("100.50")),
+        "schema.WebhookPayload": lambda: WebhookPayload(**signed[LEGACY_SCHEME]),
+        "schema.AccountsResponse": lambda: AccountsResponse.model_validate(account),
+        "schema.UserWithAccountsResponse":
+            lambda: UserWithAccountsResponse.model_validate(user),
+        "schema.UserResponse": lambda: UserResponse.model_validate(user),
+        "schema.TransactionsResponse":
+            lambda: TransactionsResponse.model_validate(transaction),
+        "schema.TokenResponse": lambda: TokenResponse.model_validate(token),
+        "schema.LogoutResponse":
+            lambda: LogoutResponse.model_validate({"message": "Successfully logged out"}),
+        "schema.WebhookBatchResponse[10]":
+            lambda: WebhookBatchResponse.model_validate(batch),
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """:return: лучшее время одного вызова в наносекундах"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> bool:
+    print(f"\n{'case':<40}{'base ns':>12}{'now ns':>12}{'change':>10}")
+    regressed = False
+    for name, ns in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<40}{'-':>12}{ns:>12.0f}{'new':>10}")
+            continue
+        change = ns / base - 1
+        mark = ""
+        if change > threshold:
+            mark = "  REGRESSION"
+            regressed = True
+        print(f"{name:<40}{base:>12.0f}{ns:>12.0f}{change:>+10.1%}{mark}")
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="только кейсы с этой подстрокой")
+    parser.add_argument("--save", help="сохранить результаты в JSON")
+    parser.add_argument("--compare", help="сравнить с сохранённым JSON")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="допустимое замедление, доля (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<40}{'ns/op':>12}{'ops/s':>14}")
+    for name, func in make_cases().items():
+        if args.filter not in name:
+            continue
+        ns = measure(func, args.repeat)
+        results[name] = ns
+        print(f"{name:<40}{ns:>12.0f}{1e9 / ns:>14.0f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "meta": {
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Сравнение сериализации списков: per-row model_validate/model_dump + ujson
+против TypeAdapter.dump_json из app.serialization.
+
+Запуск: python -m benchmarks.bench_serialization [--rows 10000]
+"""
+import argparse
+import time
+import tracemalloc
+from decimal import Decimal
+from types import SimpleNamespace
+
+import ujson
+
+from app.schemas.account import AccountsResponse
+from app.schemas.transaction import TransactionsResponse
+from app.serialization import accounts_adapter, transactions_adapter
+
+
+def make_rows(count: int) -> tuple[list, list]:
+    accounts = [
+        SimpleNamespace(id=i, balance=Decimal(i) / 100 + Decimal("0.00"))
+        for i in range(count)
+    ]
+    transactions = [
+        SimpleNamespace(account_id=i % 50, amount=Decimal("12.30")) for i in range(count)
+    ]
+    return accounts, transactions
+
+
+def per_row(model, rows) -> bytes:
+    data = [model.model_validate(row).model_dump(mode="json") for row in rows]
+    return ujson.dumps(data).encode()
+
+
+def adapter_dump(adapter, rows) -> bytes:
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+
+def measure(func, *args, repeat: int = 5) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    accounts, transactions = make_rows(args.rows)
+    cases = [
+        ("accounts", AccountsResponse, accounts_adapter, accounts),
+        ("transactions", TransactionsResponse, transactions_adapter, transactions),
+    ]
+
+    print(f"{'case':<28}{'us/row':>10}{'rows/s':>12}{'peak KiB':>12}")
+    for name, model, adapter, rows in cases:
+        assert per_row(model, rows) == adapter_dump(adapter, rows)
+        for label, func, target in (
+            ("per-row + ujson", per_row, model),
+            ("TypeAdapter.dump_json", adapter_dump, adapter),
+        ):
+            seconds, peak = measure(func, target, rows)
+            print(
+                f"{name + ' ' + label:<28}"
+                f"{seconds / len(rows) * 1e6:>10.2f}"
+                f"{len(rows) / seconds:>12.0f}"
+                f"{peak / 1024:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Время импорта и сборки приложения в свежем интерпретаторе: то, что
+платит каждый воркер, запуск Alembic и CLI-утилиты при холодном старте.
+База данных не нужна, но нужен .env, как для самого приложения.
+
+Каждая цель импортируется в отдельном процессе --repeat раз, берётся
+лучший результат за вычетом запуска пустого интерпретатора. Импорт
+app.server включает create_app(). Код выхода 1, если цель не уложилась
+в бюджет.
+
+Запуск: python -m benchmarks.bench_startup [--top 10] [--budget app.server=1500]
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+# Бюджеты в миллисекундах поверх запуска пустого интерпретатора
+DEFAULT_BUDGETS_MS = {
+    "settings": 400,
+    "database.models": 1000,
+    "database.engine": 1200,
+    "app.server": 2500,
+}
+
+
+def run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True,
+        text=True,
+    )
+
+
+def measure(code: str, repeat: int) -> float:
+    """:return: лучшее время в миллисекундах"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run_python(code)
+        elapsed = (time.perf_counter() - started) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"{code!r} failed:\n{result.stderr}")
+        best = min(best, elapsed)
+    return best
+
+
+def top_imports(module: str, count: int) -> list[tuple[int, str]]:
+    """Самые дорогие модули по -X importtime (накопительно, мкс)."""
+    result = run_python(f"import {module}", "-X", "importtime")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def parse_budgets(values: list[str]) -> dict[str, float]:
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    for value in values:
+        module, _, ms = value.partition("=")
+        budgets[module] = float(ms)
+    return budgets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0,
+                        help="показать N самых дорогих импортов для каждой цели")
+    parser.add_argument("--budget", action="append", default=[],
+                        metavar="MODULE=MS", help="бюджет цели в мс")
+    args = parser.parse_args()
+
+    budgets = parse_budgets(args.budget)
+    baseline = measure("pass", args.repeat)
+    print(f"bare interpreter: {baseline:.0f} ms\n")
+    print(f"{'target':<24}{'ms':>10}{'budget':>10}")
+
+    failed = False
+    for module, budget in budgets.items():
+        elapsed = measure(f"import {module}", args.repeat) - baseline
+        mark = ""
+        if elapsed > budget:
+            mark = "  OVER BUDGET"
+            failed = True
+        print(f"{module:<24}{elapsed:>10.0f}{budget:>10.0f}{mark}")
+
+        for cumulative, name in top_imports(module, args.top):
+            print(f"    {cumulative / 1000:>8.1f} ms  {name}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
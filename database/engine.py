@@ -1,14 +1,176 @@
+import itertools
+import time
+from collections import defaultdict
 from contextvars import ContextVar
+from typing import Callable, Optional
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
+                                    async_sessionmaker, create_async_engine)
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from app.metrics import db_pool_checkout_seconds, db_query_seconds
+from database.query_stats import query_stats_ctx
 from settings import settings
 
-engine = create_async_engine(
-    url=settings.db_url,
-    echo=True,
-)
 
-_sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+class PoolWait:
+    """Ожидание соединения из пула: затухающее среднее и самая старая ждущая выдача."""
+
+    def __init__(self, half_life: float = 1.0, alpha: float = 0.2):
+        self.half_life = half_life
+        self.alpha = alpha
+        self._average = 0.0
+        self._updated = time.perf_counter()
+        self._pending: dict[int, float] = {}
+        self._ids = itertools.count()
+
+    def start(self) -> int:
+        checkout_id = next(self._ids)
+        self._pending[checkout_id] = time.perf_counter()
+        return checkout_id
+
+    def finish(self, checkout_id: int) -> None:
+        self.observe(time.perf_counter() - self._pending.pop(checkout_id))
+
+    def observe(self, elapsed: float) -> None:
+        now = time.perf_counter()
+        average = self._decayed(now)
+        self._average = average + self.alpha * (elapsed - average)
+        self._updated = now
+
+    def _decayed(self, now: float) -> float:
+        # Без новых выдач оценка иначе осталась бы высокой навсегда
+        return self._average * 0.5 ** ((now - self._updated) / self.half_life)
+
+    def current(self) -> float:
+        now = time.perf_counter()
+        waiting = 0.0
+        if self._pending:
+            # Словарь хранит порядок вставки: первая запись — самая старая
+            waiting = now - next(iter(self._pending.values()))
+        return max(self._decayed(now), waiting)
+
+
+pool_waits: defaultdict[str, PoolWait] = defaultdict(PoolWait)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий выдачу соединения: ожидание, подключение и pre-ping."""
+
+    def _exhausted(self) -> bool:
+        if self._max_overflow < 0:
+            return False
+        return self.checkedout() >= self.size() + self._max_overflow
+
+    def connect(self):
+        started = time.perf_counter()
+        wait = pool_waits[self._orig_logging_name]
+        # Подключение и pre-ping при свободном пуле — не ожидание пула:
+        # под нагрузкой их время растёт вместе с задержкой event loop
+        checkout_id = wait.start() if self._exhausted() else None
+        try:
+            return super().connect()
+        finally:
+            if checkout_id is None:
+                wait.observe(0.0)
+            else:
+                wait.finish(checkout_id)
+            db_pool_checkout_seconds.observe(
+                time.perf_counter() - started, self._orig_logging_name
+            )
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.query_started
+        db_query_seconds.observe(elapsed, name)
+
+        stats = query_stats_ctx.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+
+def make_engine(url: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url=url,
+        echo=settings.db_echo,
+        poolclass=TimedQueuePool,
+        pool_logging_name=name,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_recycle=settings.db_pool_recycle,
+        connect_args={"statement_cache_size": settings.db_statement_cache_size},
+    )
+    instrument_engine(engine, name)
+    return engine
+
+
+engine: Optional[AsyncEngine] = None
+replica_engine: Optional[AsyncEngine] = None
+
+# Привязываются к движкам в init_engines: пул создаётся в каждом воркере
+# после старта, а не при импорте в главном процессе
+_sessionmaker = async_sessionmaker(expire_on_commit=False)
+_read_sessionmaker = async_sessionmaker(expire_on_commit=False)
+
+
+def init_engines() -> None:
+    global engine, replica_engine
+    if engine is not None:
+        return
+
+    engine = make_engine(settings.db_url, "primary")
+    # Без реплики чтения идут в тот же пул, что и запись
+    replica_engine = (
+        make_engine(settings.db_replica_url, "replica")
+        if settings.db_replica_url
+        else engine
+    )
+    _sessionmaker.configure(bind=engine)
+    _read_sessionmaker.configure(bind=replica_engine)
+
+
+async def dispose_engines() -> None:
+    global engine, replica_engine
+    if engine is None:
+        return
+
+    if replica_engine is not engine:
+        await replica_engine.dispose()
+    await engine.dispose()
+    engine = replica_engine = None
+
+
+_AFTER_COMMIT_KEY = "after_commit"
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Вызывает callback после COMMIT транзакции сессии; при откате отбрасывает."""
+    session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, ()):
+        callback()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_after_commit(session: Session, transaction) -> None:
+    # Внешняя транзакция завершилась без COMMIT (после него список уже пуст)
+    if transaction.parent is None:
+        session.info.pop(_AFTER_COMMIT_KEY, None)
+
 
 _base_model_session_ctx = ContextVar("session")
@@ -1,8 +1,16 @@
-import importlib
-from pathlib import Path
+from database.models.account import Account
+from database.models.base import Base
+from database.models.rollup import AccountDailyRollup
+from database.models.token import RefreshToken, RevokedToken
+from database.models.transaction import Transaction
+from database.models.user import User
 
-models_dir = Path(__file__).parent
-for filename in models_dir.glob("*.py"):
-    if filename.name != "__init__.py" and not filename.name.startswith("_"):
-        module_name = f"database.models.{filename.stem}"
-        importlib.import_module(module_name)
+__all__ = [
+    "Account",
+    "AccountDailyRollup",
+    "Base",
+    "RefreshToken",
+    "RevokedToken",
+    "Transaction",
+    "User",
+]
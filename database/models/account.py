@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.models.base import Base, Decimal10_2
@@ -15,3 +15,5 @@ class Account(Base):
 
     user: Mapped["User"] = relationship(back_populates="accounts")
     transactions: Mapped[list["Transaction"]] = relationship(back_populates="account")
+
+    __table_args__ = (Index("ix_accounts_user_id_id", "user_id", "id"),)
@@ -0,0 +1,27 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Date, ForeignKey, Numeric, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.models.base import Base
+
+
+class AccountDailyRollup(Base):
+    """Обороты счёта за сутки (UTC), обновляются вместе с балансом."""
+
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    # Шире баланса: сумма оборотов за день может превысить Numeric(10, 2)
+    incoming: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2), default=Decimal("0.00"), nullable=False
+    )
+    outgoing: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2), default=Decimal("0.00"), nullable=False
+    )
+    transactions_count: Mapped[int] = mapped_column(default=0, nullable=False)
+    created_at = None
+
+    __table_args__ = (UniqueConstraint("account_id", "day"),)
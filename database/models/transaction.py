@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -19,3 +19,8 @@ class Transaction(Base):
 
     user: Mapped["User"] = relationship(back_populates="transactions")
     account: Mapped["Account"] = relationship(back_populates="transactions")
+
+    __table_args__ = (
+        Index("ix_transactions_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_transactions_account_id", "account_id"),
+    )
@@ -0,0 +1,107 @@
+"""
+Перевод revokedtokens на дневные партиции по expires_at и обратно.
+
+Запуск после make migrate: python -m database.partition_revokedtokens [--revert],
+затем REVOKED_TOKENS_PARTITIONED=True в .env (перед --revert — False).
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from database.engine import _sessionmaker, dispose_engines, init_engines
+from database.partitions import (REVOKED_TOKENS_DEFAULT_PARTITION,
+                                 create_partition_sql, is_partitioned_sql)
+from settings import settings
+
+COLUMNS = "jti, user_id, token_type, revoked_at, expires_at, id"
+
+
+def create_table_sql(partitioned: bool) -> list[str]:
+    # Первичный и уникальный ключи партиционированной таблицы обязаны
+    # включать ключ партиционирования
+    key = "id, expires_at" if partitioned else "id"
+    jti_key = "jti, expires_at" if partitioned else "jti"
+    return [
+        f"""
+        CREATE TABLE revokedtokens (
+            jti VARCHAR(36) NOT NULL,
+            user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            token_type VARCHAR(10) NOT NULL,
+            revoked_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            id INTEGER DEFAULT nextval('revokedtokens_id_seq') NOT NULL,
+            CONSTRAINT revokedtokens_pkey PRIMARY KEY ({key})
+        ){" PARTITION BY RANGE (expires_at)" if partitioned else ""}
+        """,
+        f"CREATE UNIQUE INDEX ix_revokedtokens_jti ON revokedtokens ({jti_key})",
+        "CREATE INDEX ix_revokedtokens_expires_at ON revokedtokens (expires_at)",
+    ]
+
+
+def swap_table_sql(partitioned: bool) -> list[str]:
+    statements = [
+        # Запись в таблицу стоит до конца перевода: запускайте вне пика
+        "LOCK TABLE revokedtokens IN ACCESS EXCLUSIVE MODE",
+        "ALTER SEQUENCE revokedtokens_id_seq OWNED BY NONE",
+        "ALTER TABLE revokedtokens RENAME TO revokedtokens_old",
+        "ALTER TABLE revokedtokens_old RENAME CONSTRAINT revokedtokens_pkey "
+        "TO revokedtokens_old_pkey",
+        "ALTER INDEX ix_revokedtokens_jti RENAME TO ix_revokedtokens_old_jti",
+        "ALTER INDEX IF EXISTS ix_revokedtokens_expires_at "
+        "RENAME TO ix_revokedtokens_old_expires_at",
+        *create_table_sql(partitioned),
+    ]
+
+    if partitioned:
+        statements.append(
+            f"CREATE TABLE {REVOKED_TOKENS_DEFAULT_PARTITION} "
+            "PARTITION OF revokedtokens DEFAULT"
+        )
+        today = datetime.now(timezone.utc).date()
+        horizon = settings.jwt_refresh_token_expiration // 86400 + 1
+        statements.extend(
+            create_partition_sql(today + timedelta(days=offset))
+            for offset in range(horizon + 1)
+        )
+
+    # Истёкшие записи не переносим: они уже не влияют на проверку токенов
+    statements += [
+        f"""
+        INSERT INTO revokedtokens ({COLUMNS})
+        SELECT {COLUMNS} FROM revokedtokens_old WHERE expires_at > now()
+        """,
+        "DROP TABLE revokedtokens_old",
+        "ALTER SEQUENCE revokedtokens_id_seq OWNED BY revokedtokens.id",
+    ]
+    return statements
+
+
+async def run(partitioned: bool) -> None:
+    init_engines()
+    try:
+        async with _sessionmaker() as session, session.begin():
+            if await session.scalar(text(is_partitioned_sql())) == partitioned:
+                print(f"revokedtokens is already {'' if partitioned else 'not '}partitioned")
+                return
+            for statement in swap_table_sql(partitioned):
+                await session.execute(text(statement))
+        print(f"revokedtokens is now {'' if partitioned else 'not '}partitioned")
+    finally:
+        await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--revert", action="store_true",
+                        help="вернуть обычную таблицу без партиций")
+    args = parser.parse_args()
+
+    asyncio.run(run(partitioned=not args.revert))
+
+
+if __name__ == "__main__":
+    main()
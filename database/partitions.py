@@ -0,0 +1,46 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+REVOKED_TOKENS_TABLE = "revokedtokens"
+REVOKED_TOKENS_PARTITION_PREFIX = f"{REVOKED_TOKENS_TABLE}_p"
+REVOKED_TOKENS_DEFAULT_PARTITION = f"{REVOKED_TOKENS_TABLE}_default"
+
+
+def partition_name(day: date) -> str:
+    return f"{REVOKED_TOKENS_PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> Optional[date]:
+    if not name.startswith(REVOKED_TOKENS_PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(
+            name[len(REVOKED_TOKENS_PARTITION_PREFIX):], "%Y%m%d"
+        ).date()
+    except ValueError:
+        return None
+
+
+def create_partition_sql(day: date) -> str:
+    """Дневная партиция revokedtokens по expires_at, границы в UTC."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(day)} "
+        f"PARTITION OF {REVOKED_TOKENS_TABLE} "
+        f"FOR VALUES FROM ('{day} 00:00:00+00') "
+        f"TO ('{day + timedelta(days=1)} 00:00:00+00')"
+    )
+
+
+def list_partitions_sql() -> str:
+    return (
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        f"WHERE i.inhparent = '{REVOKED_TOKENS_TABLE}'::regclass"
+    )
+
+
+def is_partitioned_sql() -> str:
+    return (
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        f"WHERE partrelid = '{REVOKED_TOKENS_TABLE}'::regclass)"
+    )
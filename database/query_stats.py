@@ -0,0 +1,56 @@
+from contextvars import ContextVar
+from typing import Optional
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryStats:
+    """Счётчик SQL-запросов одного HTTP-запроса с бюджетом и проверкой N+1."""
+
+    __slots__ = ("count", "time", "budget", "repeat_limit", "strict",
+                 "shapes", "violations", "closed")
+
+    def __init__(self, budget: int = 0, repeat_limit: int = 0, strict: bool = False):
+        self.count = 0
+        self.time = 0.0
+        self.budget = budget
+        self.repeat_limit = repeat_limit
+        self.strict = strict
+        self.shapes: Optional[dict[str, int]] = {} if repeat_limit else None
+        self.violations: list[str] = []
+        self.closed = False
+
+    def record(self, statement: str, elapsed: float) -> None:
+        if self.closed:
+            return
+
+        self.count += 1
+        self.time += elapsed
+
+        if self.budget and self.count == self.budget + 1:
+            self._violate(f"Query budget of {self.budget} exceeded")
+
+        if self.shapes is not None:
+            # Параметры уже вынесены в плейсхолдеры, строка SQL и есть «форма»
+            repeats = self.shapes.get(statement, 0) + 1
+            self.shapes[statement] = repeats
+            if repeats == self.repeat_limit:
+                self._violate(
+                    f"Statement repeated {repeats} times, possible N+1: "
+                    f"{' '.join(statement.split())[:200]}"
+                )
+
+    def close(self) -> None:
+        self.closed = True
+
+    def _violate(self, message: str) -> None:
+        self.violations.append(message)
+        if self.strict:
+            raise QueryBudgetExceeded(message)
+
+
+query_stats_ctx: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
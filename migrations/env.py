@@ -6,11 +6,9 @@ from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
-from database.models.base import Base
-from database.models.base import Base as EnvBase
+from database.models import Base
 from settings import settings
 
-print("ID Base в env.py:", id(EnvBase))
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -36,8 +36,8 @@ def upgrade() -> None:
                     0.00
                 FROM new_users nu
                 WHERE nu.email = 'test@mail.com'
-            """).bindparams(bindparam("hash1", value=settings.test_user_password),
-                            bindparam("hash2", value=settings.admin_user_password), ))
+            """).bindparams(bindparam("hash1", value=settings.test_user_password_hash),
+                            bindparam("hash2", value=settings.admin_user_password_hash), ))
 
 
 def downgrade() -> None:
@@ -0,0 +1,41 @@
+"""refresh token digest
+
+Revision ID: 0351624e6404
+Revises: ec8051d760f5
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0351624e6404'
+down_revision: Union[str, None] = 'ec8051d760f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # bcrypt-хеши нельзя перевести в HMAC-дайджесты: пользователи войдут заново
+    op.execute("DELETE FROM refreshtokens")
+    op.drop_constraint('refreshtokens_token_key', 'refreshtokens', type_='unique')
+    op.alter_column('refreshtokens', 'token',
+                    new_column_name='token_hash',
+                    type_=sa.String(length=64),
+                    existing_nullable=False)
+    op.create_index(op.f('ix_refreshtokens_token_hash'), 'refreshtokens', ['token_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM refreshtokens")
+    op.drop_index(op.f('ix_refreshtokens_token_hash'), table_name='refreshtokens')
+    op.alter_column('refreshtokens', 'token_hash',
+                    new_column_name='token',
+                    type_=sa.String(length=512),
+                    existing_nullable=False)
+    op.create_unique_constraint('refreshtokens_token_key', 'refreshtokens', ['token'])
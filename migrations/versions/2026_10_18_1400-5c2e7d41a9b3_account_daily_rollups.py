@@ -0,0 +1,57 @@
+"""account daily rollups
+
+Revision ID: 5c2e7d41a9b3
+Revises: 0351624e6404
+Create Date: 2026-10-18 14:00:00.000000
+
+Заполняет сводки по уже сохранённым транзакциям. Таблица transactions
+на время заполнения блокируется от записи, поэтому вебхуки, пришедшие
+во время миграции, дождутся её конца. Применяйте до запуска новой
+версии: старая не обновляет сводки.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e7d41a9b3'
+down_revision: Union[str, None] = '0351624e6404'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('accountdailyrollups',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('incoming', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('outgoing', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('transactions_count', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('account_id', 'day')
+    )
+
+    op.execute("LOCK TABLE transactions IN SHARE MODE")
+    op.execute(
+        """
+        INSERT INTO accountdailyrollups (account_id, day, incoming, outgoing, transactions_count)
+        SELECT account_id,
+               (created_at AT TIME ZONE 'UTC')::date,
+               COALESCE(SUM(amount) FILTER (WHERE amount > 0), 0),
+               COALESCE(-SUM(amount) FILTER (WHERE amount < 0), 0),
+               COUNT(*)
+        FROM transactions
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('accountdailyrollups')
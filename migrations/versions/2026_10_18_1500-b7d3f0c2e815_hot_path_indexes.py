@@ -0,0 +1,70 @@
+"""hot path indexes
+
+Revision ID: b7d3f0c2e815
+Revises: 5c2e7d41a9b3
+Create Date: 2026-10-18 15:00:00.000000
+
+Индексы под запросы маршрутов, строятся CREATE INDEX CONCURRENTLY без
+блокировки записи. CONCURRENTLY не работает внутри транзакции, поэтому
+каждый индекс строится в autocommit_block. Прерванная сборка оставляет
+невалидный индекс: при повторном запуске он удаляется и строится заново.
+Проверка планов: pytest tests/test_query_plans.py
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3f0c2e815'
+down_revision: Union[str, None] = '5c2e7d41a9b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # /user/transactions: user_id = ? ORDER BY created_at, id с keyset-курсором
+    ('ix_transactions_user_id_created_at_id', 'transactions', ['user_id', 'created_at', 'id']),
+    # внешний ключ: удаление счёта и выборки по счёту
+    ('ix_transactions_account_id', 'transactions', ['account_id']),
+    # /user/accounts (ORDER BY id), сводка и выгрузка пользователей со счетами
+    ('ix_accounts_user_id_id', 'accounts', ['user_id', 'id']),
+    # удаление refresh-токенов пользователя при входе и выходе
+    ('ix_refreshtokens_user_id', 'refreshtokens', ['user_id']),
+]
+
+
+def _drop_if_invalid(name: str) -> None:
+    # В offline-режиме (--sql) базы нет, проверять нечего
+    if context.is_offline_mode():
+        return
+    invalid = op.get_bind().scalar(
+        sa.text(
+            "SELECT NOT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+        ),
+        {"name": name},
+    )
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            _drop_if_invalid(name)
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
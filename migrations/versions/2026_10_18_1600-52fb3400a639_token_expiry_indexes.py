@@ -0,0 +1,70 @@
+"""token expiry indexes
+
+Revision ID: 52fb3400a639
+Revises: b7d3f0c2e815
+Create Date: 2026-10-18 16:00:00.000000
+
+Индексы по expires_at под пачки фоновой очистки токенов, CONCURRENTLY,
+как в b7d3f0c2e815. На партиционированной revokedtokens CONCURRENTLY
+не поддерживается: там индекс строится обычным CREATE INDEX.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from database.partitions import is_partitioned_sql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '52fb3400a639'
+down_revision: Union[str, None] = 'b7d3f0c2e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_revokedtokens_expires_at', 'revokedtokens', ['expires_at']),
+    ('ix_refreshtokens_expires_at', 'refreshtokens', ['expires_at']),
+]
+
+
+def _concurrently(table: str) -> bool:
+    if table != 'revokedtokens' or context.is_offline_mode():
+        return True
+    return not op.get_bind().scalar(sa.text(is_partitioned_sql()))
+
+
+def _drop_if_invalid(name: str) -> None:
+    # В offline-режиме (--sql) базы нет, проверять нечего
+    if context.is_offline_mode():
+        return
+    invalid = op.get_bind().scalar(
+        sa.text(
+            "SELECT NOT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+        ),
+        {"name": name},
+    )
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            _drop_if_invalid(name)
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=_concurrently(table), if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=_concurrently(table), if_exists=True,
+            )
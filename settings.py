@@ -1,11 +1,9 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from functools import cached_property
 from pydantic import SecretStr, FilePath
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from app.auth.service import AuthService
-
 
 class Settings(BaseSettings):
     """
@@ -30,13 +28,81 @@ class Settings(BaseSettings):
                 f"{self.user}:{self.password.get_secret_value()}"
                 f"@{self.host}:{self.port}/{self.db}")
 
+    db_replica_url: Optional[str] = None
+    db_echo: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800
+    db_statement_cache_size: int = 100
+    # Проверки числа SQL-запросов на HTTP-запрос, только при debug (0 — выкл.)
+    db_query_budget: int = 30
+    db_repeated_query_limit: int = 5
+    db_query_budget_strict: bool = False
+
     # api
     redis_url: str
     sentry_dns: SecretStr
     debug: bool = True
+    # Документация OpenAPI; по умолчанию только при debug
+    openapi: Optional[bool] = None
+
+    @property
+    def openapi_enabled(self) -> bool:
+        return self.debug if self.openapi is None else self.openapi
+
+    # Число процессов-воркеров Sanic на общем сокете
+    workers: int = 1
+    # Канал LISTEN/NOTIFY для сброса состояния в памяти воркеров
+    invalidation_channel: str = "invalidation"
+    invalidation_keepalive: float = 10.0
+
+    # logging
+    log_level: Optional[Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]] = None
+    log_format: Literal["text", "json"] = "text"
+    log_sample_rates: dict[str, float] = {}
+    log_batch_size: int = 256
 
     # service
     secret_key: SecretStr
+    signature_scheme: Literal["legacy", "hmac-sha256"] = "legacy"
+    hash_pool_size: int = 2
+    hash_queue_size: int = 32
+
+    # webhook
+    webhook_batch_max_size: int = 1000
+    webhook_coalesce_window_ms: float = 5.0
+    webhook_coalesce_max_batch: int = 100
+    webhook_recent_ids_size: int = 100_000
+    # Допуск вебхуков: одновременно в обработчиках, в очереди и сколько
+    # ждать в ней; отказ сразу, пока ожидание пула БД выше порога (0 — выкл.)
+    webhook_max_in_flight: int = 256
+    webhook_max_queue: int = 512
+    webhook_queue_timeout: float = 1.0
+    webhook_pool_wait_threshold: float = 0.5
+    # Token bucket на IP источника: запросов в секунду и запас (0 — выкл.).
+    # По умолчанию выключен: эмулятор шлёт всю нагрузку с одного IP
+    webhook_rate_limit: float = 0.0
+    webhook_rate_burst: int = 1000
+    webhook_rate_limit_clients: int = 100_000
+
+    # pagination
+    page_default_limit: int = 100
+    page_max_limit: int = 1000
+    stream_chunk_size: int = 1000
+
+    # Кэш /user/accounts в памяти воркера (TTL 0 — выкл.)
+    accounts_cache_size: int = 10_000
+    accounts_cache_ttl: float = 30.0
+    # Сколько секунд после записи перечитывать счета с основной базы, а не с реплики
+    accounts_cache_replica_lag: float = 2.0
+
+    # token sweeper
+    token_sweep_interval: float = 300.0
+    token_sweep_batch_size: int = 1000
+    token_sweep_batch_pause: float = 0.05
+    revoked_tokens_partitioned: bool = False
 
     #jwt
     algorithm: str
@@ -45,6 +111,10 @@ class Settings(BaseSettings):
 
     jwt_private_key_path: Optional[FilePath] = None
     jwt_public_key_path: Optional[FilePath] = None
+    # kid текущего ключа и публичные ключи прошлых kid на время ротации
+    jwt_key_id: str = "default"
+    jwt_previous_public_keys: dict[str, FilePath] = {}
+    jwt_verified_cache_size: int = 10_000
 
     @cached_property
     def private_key(self) -> SecretStr:
@@ -54,12 +124,27 @@ class Settings(BaseSettings):
     def public_key(self) -> str:
         return self.jwt_public_key_path.read_text()
 
-    test_user_password: str = AuthService.hash_password(
-        SecretStr("default_test_password")
-    )
-    admin_user_password: str = AuthService.hash_password(
-        SecretStr("default_admin_password")
-    )
+    # Тестовые пользователи из миграции: готовый хеш пароля, как раньше,
+    # или пароль, который хешируется только при обращении, а не на каждый
+    # импорт настроек
+    test_user_password: Optional[str] = None
+    admin_user_password: Optional[str] = None
+    test_user_default_password: SecretStr = SecretStr("default_test_password")
+    admin_user_default_password: SecretStr = SecretStr("default_admin_password")
+
+    @cached_property
+    def test_user_password_hash(self) -> str:
+        from app.auth.service import AuthService
+        return self.test_user_password or AuthService.hash_password(
+            self.test_user_default_password
+        )
+
+    @cached_property
+    def admin_user_password_hash(self) -> str:
+        from app.auth.service import AuthService
+        return self.admin_user_password or AuthService.hash_password(
+            self.admin_user_default_password
+        )
 
 
 settings = Settings()
@@ -0,0 +1,106 @@
+"""
+Тесты запускаются с тем же .env, что и приложение. Тесты с базой
+берут её из .env (после make migrate) и пропускаются, если она
+недоступна; всё, что они пишут, откатывается.
+
+pytest-asyncio не нужен: async-часть теста выполняется через asyncio.run.
+"""
+import asyncio
+import uuid
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Iterator
+
+import asyncpg
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database.engine as db_engine
+from app.schemas.webhook import WebhookPayload
+from database.engine import dispose_engines, init_engines
+from database.query_stats import QueryStats, query_stats_ctx
+from settings import settings
+
+
+async def _with_session(test: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+    init_engines()
+    try:
+        async with db_engine.engine.connect() as connection:
+            transaction = await connection.begin()
+            # session.begin() кода под тестом открывает точку сохранения
+            # внутри внешней транзакции, а её откат убирает всё
+            session = AsyncSession(
+                bind=connection,
+                join_transaction_mode="create_savepoint",
+                expire_on_commit=False,
+            )
+            try:
+                return await test(session)
+            finally:
+                await session.close()
+                await transaction.rollback()
+    finally:
+        # Пул привязан к циклу событий, а у каждого asyncio.run он свой
+        await dispose_engines()
+
+
+@pytest.fixture(scope="session")
+def db() -> None:
+    """Пропускает тест, если база из .env недоступна."""
+
+    async def ping(session: AsyncSession) -> None:
+        await session.execute(text("SELECT 1"))
+
+    try:
+        asyncio.run(asyncio.wait_for(_with_session(ping), timeout=5))
+    # asyncpg.PostgresError: например, базы из .env нет (InvalidCatalogNameError)
+    except (OSError, DBAPIError, asyncpg.PostgresError, asyncio.TimeoutError) as e:
+        pytest.skip(f"Database is not available: {e}")
+
+
+@pytest.fixture
+def in_transaction(db) -> Callable:
+    """
+    Выполняет async-функцию с сессией основной базы в транзакции, которая
+    затем откатывается: in_transaction(test) -> результат test(session).
+    Коммиты внутри test фиксируют только точку сохранения.
+    """
+    return lambda test: asyncio.run(_with_session(test))
+
+
+@pytest.fixture
+def query_budget(monkeypatch) -> Iterator[QueryStats]:
+    """
+    Строгий бюджет SQL-запросов на тест, как у HTTP-запроса в debug с
+    DB_QUERY_BUDGET_STRICT: запрос сверх DB_QUERY_BUDGET или повтор одного
+    SQL DB_REPEATED_QUERY_LIMIT раз (N+1) падает QueryBudgetExceeded прямо
+    в месте запроса. asyncio.run копирует контекст, поэтому счётчик видит
+    запросы in_transaction; после теста в нём их число.
+    """
+    monkeypatch.setattr(settings, "debug", True)
+    monkeypatch.setattr(settings, "db_query_budget_strict", True)
+    stats = QueryStats(
+        budget=settings.db_query_budget,
+        repeat_limit=settings.db_repeated_query_limit,
+        strict=True,
+    )
+    token = query_stats_ctx.set(stats)
+    yield stats
+    query_stats_ctx.reset(token)
+
+
+@pytest.fixture
+def make_payload() -> Callable[..., WebhookPayload]:
+    """Вебхук с новым transaction_id: make_payload("5.00", user_id=..., account_id=...)."""
+
+    def make(amount: str, user_id: int = 1, account_id: int = 1, transaction_id=None):
+        return WebhookPayload(
+            transaction_id=transaction_id or uuid.uuid4(),
+            user_id=user_id,
+            account_id=account_id,
+            amount=Decimal(amount),
+            signature="signature",
+        )
+
+    return make
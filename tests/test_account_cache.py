@@ -0,0 +1,83 @@
+import time
+
+from app.services.account_cache import AccountsCache
+
+
+def make_cache(**kwargs) -> AccountsCache:
+    return AccountsCache(**{"maxsize": 100, "ttl": 30.0, "replica_lag": 2.0, **kwargs})
+
+
+def test_fill_then_get():
+    cache = make_cache()
+    fill = cache.begin_fill(1)
+    assert not fill.read_primary
+
+    cache.fill(fill, ["account"])
+
+    assert cache.get(1) == ["account"]
+    assert cache.get(2) is None
+
+
+def test_invalidate_drops_entry_and_reads_primary_for_replica_lag():
+    cache = make_cache()
+    cache.fill(cache.begin_fill(1), ["old"])
+
+    cache.invalidate(1)
+
+    assert cache.get(1) is None
+    assert cache.begin_fill(1).read_primary
+    assert not cache.begin_fill(2).read_primary
+
+
+def test_read_started_before_invalidate_is_not_cached():
+    cache = make_cache()
+    stale = cache.begin_fill(1)
+
+    cache.invalidate(1)
+    cache.fill(stale, ["stale"])
+    assert cache.get(1) is None
+
+    fresh = cache.begin_fill(1)
+    cache.fill(fresh, ["fresh"])
+    assert cache.get(1) == ["fresh"]
+
+
+def test_invalidating_another_user_keeps_pending_fill():
+    cache = make_cache()
+    fill = cache.begin_fill(1)
+
+    cache.invalidate(2)
+    cache.fill(fill, ["accounts"])
+
+    assert cache.get(1) == ["accounts"]
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache = make_cache(ttl=5.0)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.fill(cache.begin_fill(1), ["accounts"])
+
+    monkeypatch.setattr(time, "time", lambda: now + 6)
+
+    assert cache.get(1) is None
+
+
+def test_notification_from_another_worker_invalidates():
+    cache = make_cache()
+    cache.fill(cache.begin_fill(1), ["accounts"])
+    cache.fill(cache.begin_fill(2), ["accounts"])
+
+    cache.apply_notification({"user_ids": [1]})
+
+    assert cache.get(1) is None
+    assert cache.get(2) == ["accounts"]
+
+
+def test_disabled_cache_stores_nothing():
+    cache = make_cache(ttl=0)
+    cache.fill(cache.begin_fill(1), ["accounts"])
+    cache.invalidate(1)
+
+    assert not cache.enabled
+    assert cache.get(1) is None
@@ -0,0 +1,208 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import admission
+from app.services.admission import (AdmissionController, AdmissionRejected,
+                                    RateLimited, RateLimiter,
+                                    admission_control)
+from database.engine import PoolWait
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    # Только для синхронных тестов: asyncio тоже читает time.monotonic
+    clock = Clock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    monkeypatch.setattr(time, "perf_counter", clock)
+    return clock
+
+
+def make_controller(**kwargs) -> AdmissionController:
+    return AdmissionController(
+        **{
+            "max_in_flight": 1,
+            "max_queue": 1,
+            "queue_timeout": 1.0,
+            "pool_wait_threshold": 0,
+            **kwargs,
+        }
+    )
+
+
+def test_rate_limiter_allows_burst_then_rejects(clock):
+    limiter = RateLimiter(rate=2, burst=3, maxsize=10)
+    for _ in range(3):
+        limiter.acquire("10.0.0.1")
+
+    with pytest.raises(RateLimited) as e:
+        limiter.acquire("10.0.0.1")
+    assert e.value.status == 429
+    assert e.value.retry_after == 1
+
+    # Другой адрес со своей корзиной
+    limiter.acquire("10.0.0.2")
+
+
+def test_rate_limiter_refills_at_rate(clock):
+    limiter = RateLimiter(rate=2, burst=1, maxsize=10)
+    limiter.acquire("ip")
+    with pytest.raises(RateLimited):
+        limiter.acquire("ip")
+
+    clock.now += 0.5
+    limiter.acquire("ip")
+
+
+def test_rate_limiter_evicts_least_recent_clients(clock):
+    limiter = RateLimiter(rate=1, burst=1, maxsize=2)
+    for ip in ("a", "b", "c"):
+        limiter.acquire(ip)
+
+    assert list(limiter._buckets) == ["b", "c"]
+    # У вытесненного клиента корзина снова полная
+    limiter.acquire("a")
+
+
+def test_controller_queues_in_fifo_order_and_hands_slots_over():
+    async def main():
+        controller = make_controller(max_queue=2)
+        order = []
+
+        async def request(name):
+            await controller.acquire()
+            order.append(name)
+
+        await controller.acquire()
+        waiters = [asyncio.create_task(request(name)) for name in ("b", "c")]
+        await asyncio.sleep(0)
+        assert controller.in_flight == 1 and order == []
+
+        controller.release()
+        # Ожидающий просыпается через wait_for и shield: несколько итераций цикла
+        await asyncio.sleep(0.01)
+        assert order == ["b"] and controller.in_flight == 1
+
+        controller.release()
+        await asyncio.gather(*waiters)
+        assert order == ["b", "c"]
+
+        controller.release()
+        assert controller.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_controller_rejects_when_queue_is_full():
+    async def main():
+        controller = make_controller()
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as e:
+            await controller.acquire()
+        assert (e.value.reason, e.value.status) == ("queue_full", 503)
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert not controller._waiters
+
+    asyncio.run(main())
+
+
+def test_controller_rejects_after_queue_timeout():
+    async def main():
+        controller = make_controller(queue_timeout=0.01)
+        await controller.acquire()
+
+        with pytest.raises(AdmissionRejected) as e:
+            await controller.acquire()
+        assert e.value.reason == "queue_timeout"
+        assert not controller._waiters
+
+        controller.release()
+        assert controller.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_controller_sheds_on_pool_wait(monkeypatch):
+    monkeypatch.setitem(
+        admission.pool_waits, "primary", SimpleNamespace(current=lambda: 2.4)
+    )
+
+    async def main():
+        with pytest.raises(AdmissionRejected) as e:
+            await make_controller(pool_wait_threshold=0.5).acquire()
+        assert (e.value.reason, e.value.retry_after) == ("pool_wait", 3)
+
+        # Порог 0 отключает проверку
+        await make_controller(pool_wait_threshold=0).acquire()
+
+    asyncio.run(main())
+
+
+def test_admission_control_releases_slot_when_handler_fails():
+    controller = make_controller()
+    request = SimpleNamespace(remote_addr="", ip="127.0.0.1")
+
+    @admission_control(controller)
+    async def handler(request):
+        assert controller.in_flight == 1
+        raise RuntimeError("handler failed")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(handler(request))
+    assert controller.in_flight == 0
+
+
+def test_pool_wait_average_decays(clock):
+    wait = PoolWait(half_life=1.0, alpha=0.5)
+    checkout = wait.start()
+    clock.now += 2.0
+    wait.finish(checkout)
+    assert wait.current() == 1.0
+
+    clock.now += 1.0
+    assert wait.current() == 0.5
+
+
+def test_pool_wait_counts_oldest_pending_checkout(clock):
+    wait = PoolWait()
+    wait.start()
+    clock.now += 0.5
+    wait.start()
+    clock.now += 0.5
+
+    assert wait.current() == 1.0
+
+
+def test_rate_limiter_rejection_refreshes_client(clock):
+    limiter = RateLimiter(rate=1, burst=1, maxsize=2)
+    limiter.acquire("a")
+    limiter.acquire("b")
+    with pytest.raises(RateLimited):
+        limiter.acquire("a")
+
+    limiter.acquire("c")
+
+    assert list(limiter._buckets) == ["a", "c"]
+
+
+def test_rate_limiter_requires_burst_of_at_least_one():
+    with pytest.raises(ValueError):
+        RateLimiter(rate=10, burst=0, maxsize=10)
+
+    # Выключенному лимиту запас не важен
+    RateLimiter(rate=0, burst=0, maxsize=10)
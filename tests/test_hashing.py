@@ -0,0 +1,33 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.auth.hashing import HashingPool, HashingPoolBusy
+
+
+def test_run_requires_started_pool():
+    with pytest.raises(RuntimeError):
+        asyncio.run(HashingPool(workers=1, queue_size=0).run(len, "x"))
+
+
+def test_full_queue_rejects_immediately():
+    pool = HashingPool(workers=1, queue_size=1)
+    pool.start()
+    release = threading.Event()
+
+    async def main():
+        running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(HashingPoolBusy):
+            await pool.run(len, "x")
+
+        release.set()
+        await asyncio.gather(*running)
+        assert await pool.run(len, "x") == 1
+
+    try:
+        asyncio.run(main())
+    finally:
+        release.set()
+        pool.shutdown()
@@ -0,0 +1,53 @@
+import logging
+import sys
+from queue import Queue
+
+from app.logger import BatchRotatingFileHandler, JsonFormatter, LazyQueueHandler
+
+
+def make_record(msg: str, args=(), exc_info=None) -> logging.LogRecord:
+    return logging.LogRecord("app", logging.ERROR, __file__, 1, msg, args, exc_info)
+
+
+def test_prepare_formats_message_before_args_change():
+    payload = {"status": "pending"}
+    handler = LazyQueueHandler(Queue())
+    record = make_record("payload %s", (payload,))
+
+    prepared = handler.prepare(record)
+    payload["status"] = "done"
+
+    assert prepared.getMessage() == "payload {'status': 'pending'}"
+    assert prepared.args is None
+    # Исходная запись остаётся другим обработчикам
+    assert record.msg == "payload %s"
+
+
+def test_prepare_keeps_traceback_text_but_not_frames():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record("failed", exc_info=sys.exc_info())
+
+    prepared = LazyQueueHandler(Queue()).prepare(record)
+
+    assert prepared.exc_info is None
+    assert "ValueError: boom" in prepared.exc_text
+    assert "ValueError: boom" in logging.Formatter().format(prepared)
+    assert "ValueError: boom" in JsonFormatter().format(prepared)
+
+
+def test_rotation_counts_bytes_not_characters(tmp_path):
+    handler = BatchRotatingFileHandler(
+        tmp_path / "app_logs", maxBytes=100, backupCount=1, encoding="utf-8"
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        # 81 байт, затем ещё 21: по символам (41 + 11) файл бы не ротировался
+        handler.handle_batch([make_record("я" * 40)])
+        handler.handle_batch([make_record("я" * 10)])
+    finally:
+        handler.close()
+
+    assert (tmp_path / "app_logs.1").stat().st_size == 81
+    assert (tmp_path / "app_logs").stat().st_size == 21
@@ -0,0 +1,48 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.transaction_service import TransactionService
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc)
+    transaction_id = uuid.uuid4()
+
+    parts = decode_cursor(encode_cursor(created_at, transaction_id))
+
+    assert parts == [str(created_at), str(transaction_id)]
+    assert datetime.fromisoformat(parts[0]) == created_at
+    assert uuid.UUID(parts[1]) == transaction_id
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor("?" * 30, 255)
+
+    assert set(cursor) <= set(
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_="
+    )
+
+
+@pytest.mark.parametrize("cursor", ["a", "//8="])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_next_page_continues_after_the_cursor_row():
+    after = (datetime.now(timezone.utc), uuid.uuid4())
+    sql = str(
+        TransactionService.user_transactions_query(1, after).compile(
+            dialect=postgresql.dialect()
+        )
+    )
+
+    # Сравнение кортежей по (created_at, id) в порядке сортировки страницы
+    assert "(transactions.created_at, transactions.id) > (" in sql
+    assert sql.rstrip().endswith(
+        "ORDER BY transactions.created_at, transactions.id"
+    )
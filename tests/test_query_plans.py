@@ -0,0 +1,106 @@
+"""
+Планы запросов маршрутов и фоновой очистки: ни один не должен читать
+таблицу целиком (Seq Scan).
+
+Таблицы в тестовой базе маленькие, и на них планировщик выбирает
+последовательное чтение даже при подходящем индексе. Поэтому EXPLAIN
+выполняется с enable_seqscan = off: Seq Scan остаётся в плане, только
+если подходящего индекса нет вовсе.
+"""
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Iterator
+
+import pytest
+from sqlalchemy import Executable, text
+from sqlalchemy.dialects import postgresql
+
+from app.jwt.service import (delete_refresh_tokens_query, hash_refresh_token,
+                             refresh_token_expires_at,
+                             rotate_refresh_token_query)
+from app.services.model_service import UserService
+from app.services.token_sweeper import TokenSweeper
+from app.services.transaction_service import TransactionService
+from database.models import RefreshToken, RevokedToken
+
+
+def make_queries() -> dict[str, Executable]:
+    after = (datetime.now(timezone.utc), uuid.uuid4())
+    token_hash = hash_refresh_token("token")
+    webhook_row = {
+        "id": uuid.uuid4(),
+        "user_id": 1,
+        "account_id": 1,
+        "amount": Decimal("1.00"),
+        "signature": "signature",
+    }
+
+    return {
+        # auth: вход, refresh, выход
+        "auth.user_by_email": UserService.user_by_email_query("user@example.com"),
+        "auth.user_by_id": UserService.user_query(1),
+        "auth.delete_refresh_tokens": delete_refresh_tokens_query(1),
+        "auth.rotate_refresh_token": rotate_refresh_token_query(
+            1, token_hash, token_hash, refresh_token_expires_at()
+        ),
+        # user
+        "user.accounts": UserService.user_accounts_query(1),
+        "user.summary": TransactionService.account_summary_query(
+            1, date.today().replace(day=1), date.today()
+        ),
+        "user.transactions.first_page": (
+            TransactionService.user_transactions_query(1).limit(101)
+        ),
+        "user.transactions.next_page": (
+            TransactionService.user_transactions_query(1, after).limit(101)
+        ),
+        # admin
+        "admin.users_accounts.first_page": (
+            UserService.users_with_accounts_json_query().limit(101)
+        ),
+        "admin.users_accounts.next_page": (
+            UserService.users_with_accounts_json_query(after_id=1).limit(101)
+        ),
+        # webhook: вставка, upsert счетов и дневных сводок
+        "webhook.apply_batch": TransactionService.apply_batch_query([webhook_row]),
+        # фоновая очистка токенов: пачка истёкших
+        "sweeper.revoked": TokenSweeper.delete_expired_query(
+            RevokedToken, RevokedToken.is_expired, 1000
+        ),
+        "sweeper.refresh": TokenSweeper.delete_expired_query(
+            RefreshToken, ~RefreshToken.is_active, 1000
+        ),
+    }
+
+
+QUERIES = make_queries()
+
+
+def iter_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from iter_nodes(child)
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_no_seq_scan(in_transaction, name):
+    sql = str(
+        QUERIES[name].compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+    async def explain(session):
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        return await session.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+
+    plan = in_transaction(explain)[0]["Plan"]
+    seq_scans = sorted(
+        {
+            node["Relation Name"]
+            for node in iter_nodes(plan)
+            if node["Node Type"] == "Seq Scan"
+        }
+    )
+    assert not seq_scans, f"{name} reads whole tables: {', '.join(seq_scans)}"
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import select
+
+from database.models import User
+from database.query_stats import QueryBudgetExceeded, QueryStats
+
+
+def test_counts_queries_and_time():
+    stats = QueryStats()
+    stats.record("SELECT 1", 0.25)
+    stats.record("SELECT 1", 0.5)
+
+    assert stats.count == 2
+    assert stats.time == 0.75
+    assert stats.violations == []
+
+
+def test_budget_violation_is_reported_once():
+    stats = QueryStats(budget=2)
+    for _ in range(5):
+        stats.record("SELECT 1", 0.0)
+
+    assert stats.violations == ["Query budget of 2 exceeded"]
+
+
+def test_repeated_statement_is_reported_as_n_plus_one():
+    stats = QueryStats(repeat_limit=3)
+    for _ in range(3):
+        stats.record("SELECT * FROM accounts WHERE user_id = $1", 0.0)
+    stats.record("SELECT * FROM users", 0.0)
+
+    assert len(stats.violations) == 1
+    assert "possible N+1" in stats.violations[0]
+
+
+def test_strict_mode_raises_at_the_extra_query():
+    stats = QueryStats(budget=1, strict=True)
+    stats.record("SELECT 1", 0.0)
+
+    with pytest.raises(QueryBudgetExceeded):
+        stats.record("SELECT 2", 0.0)
+
+
+def test_closed_stats_ignore_queries():
+    stats = QueryStats(budget=1, strict=True)
+    stats.close()
+    stats.record("SELECT 1", 0.0)
+    stats.record("SELECT 2", 0.0)
+
+    assert stats.count == 0
+
+
+def test_strict_budget_fixture_catches_n_plus_one(in_transaction, query_budget):
+    async def n_plus_one(session):
+        for user_id in range(query_budget.repeat_limit):
+            await session.scalar(select(User).where(User.id == user_id))
+
+    with pytest.raises(QueryBudgetExceeded, match="possible N\\+1"):
+        in_transaction(n_plus_one)
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+from app.auth.decorators import public
+from app.middleware.jwt_auth import apply_route_policies
+
+
+def make_app(*routes) -> SimpleNamespace:
+    return SimpleNamespace(
+        config=SimpleNamespace(OAS_URL_PREFIX="/docs"),
+        router=SimpleNamespace(routes=list(routes)),
+    )
+
+
+def make_route(path: str, handler=None) -> SimpleNamespace:
+    async def private(request):
+        pass
+
+    return SimpleNamespace(path=path, handler=handler or private, ctx=SimpleNamespace())
+
+
+def test_docs_and_public_handlers_skip_auth():
+    @public
+    async def login(request):
+        pass
+
+    docs, docs_page, docstore, api_login, accounts = routes = (
+        make_route("docs"),
+        make_route("docs/swagger"),
+        make_route("docstore"),
+        make_route("api/auth/login", login),
+        make_route("api/user/accounts"),
+    )
+
+    apply_route_policies(make_app(*routes))
+
+    assert docs.ctx.public and docs_page.ctx.public and api_login.ctx.public
+    # Общий префикс с документацией не делает маршрут публичным
+    assert not docstore.ctx.public
+    assert not accounts.ctx.public
@@ -0,0 +1,64 @@
+import uuid
+
+import pytest
+
+from app.signature.signature_service import (HMAC_SHA256_SCHEME, LEGACY_SCHEME,
+                                             TransactionSignatureService)
+
+SECRET_KEY = "secret"
+
+
+def make_item(scheme: str, amount: str = "10.50") -> dict:
+    item = {
+        "transaction_id": str(uuid.uuid4()),
+        "user_id": 1,
+        "account_id": 2,
+        "amount": amount,
+    }
+    item["signature"] = TransactionSignatureService.generate_signature(
+        item, SECRET_KEY, scheme
+    )
+    return item
+
+
+@pytest.mark.parametrize("scheme", [LEGACY_SCHEME, HMAC_SHA256_SCHEME])
+def test_verify_many_matches_verify_signature(scheme):
+    good = make_item(scheme)
+    tampered = {**make_item(scheme), "amount": "99.00"}
+    wrong_key = {
+        **good,
+        "signature": TransactionSignatureService.generate_signature(
+            good, "other", scheme
+        ),
+    }
+    items = [good, tampered, wrong_key]
+
+    expected = [
+        TransactionSignatureService.verify_signature(item, SECRET_KEY, scheme)
+        for item in items
+    ]
+
+    assert expected == [True, False, False]
+    assert TransactionSignatureService.verify_many(items, SECRET_KEY, scheme) == expected
+
+
+@pytest.mark.parametrize("scheme", [LEGACY_SCHEME, HMAC_SHA256_SCHEME])
+def test_verify_many_treats_malformed_items_as_unsigned(scheme):
+    unsigned = make_item(scheme)
+    del unsigned["signature"]
+    missing_field = make_item(scheme)
+    del missing_field["amount"]
+
+    items = [make_item(scheme), unsigned, missing_field, "not a dict", None]
+
+    assert TransactionSignatureService.verify_many(items, SECRET_KEY, scheme) == [
+        True, False, False, False, False,
+    ]
+
+
+def test_schemes_produce_different_signatures():
+    item = make_item(LEGACY_SCHEME)
+
+    assert not TransactionSignatureService.verify_signature(
+        item, SECRET_KEY, HMAC_SHA256_SCHEME
+    )
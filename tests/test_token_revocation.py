@@ -0,0 +1,47 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.jwt.revocation import revoked_tokens
+from app.jwt.service import is_token_revoked, revoked_token
+from database.models.user import User
+
+
+async def revoke(session, jti: str) -> None:
+    user_id = await session.scalar(select(func.min(User.id)))
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+    await revoked_token({"id": user_id}, "access", jti, expires_at, session)
+
+
+def test_revocation_is_cached_after_commit(in_transaction):
+    jti = str(uuid.uuid4())
+
+    async def test(session):
+        async with session.begin():
+            await revoke(session, jti)
+            assert not is_token_revoked(jti)
+        assert is_token_revoked(jti)
+
+    try:
+        in_transaction(test)
+    finally:
+        revoked_tokens._entries.pop(jti, None)
+
+
+def test_revocation_is_not_cached_after_rollback(in_transaction):
+    jti = str(uuid.uuid4())
+
+    async def test(session):
+        with pytest.raises(RuntimeError):
+            async with session.begin():
+                await revoke(session, jti)
+                raise RuntimeError("handler failed")
+
+        # Следующая транзакция той же сессии не подхватывает отменённый отзыв
+        async with session.begin():
+            pass
+        assert not is_token_revoked(jti)
+
+    in_transaction(test)
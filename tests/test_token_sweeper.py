@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+import database.engine as db_engine
+from app.services.token_sweeper import TokenSweeper
+from database.engine import dispose_engines, init_engines
+from settings import settings
+
+
+def make_sweeper(monkeypatch) -> TokenSweeper:
+    async def delete_expired(model, expired):
+        return 0
+
+    sweeper = TokenSweeper(interval=1, batch_size=10, batch_pause=0)
+    # Проход не должен удалять данные базы разработки
+    monkeypatch.setattr(sweeper, "delete_expired", delete_expired)
+    return sweeper
+
+
+async def lock_is_free(key: int) -> bool:
+    # Отдельное соединение вне пула: в той же сессии блокировка берётся
+    # повторно, даже если её не сняли
+    engine = create_async_engine(settings.db_url, poolclass=NullPool)
+    try:
+        # Закрытие соединения сервер обрабатывает не мгновенно
+        for _ in range(20):
+            async with engine.connect() as connection:
+                if await connection.scalar(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": key}
+                ):
+                    return True
+            await asyncio.sleep(0.05)
+        return False
+    finally:
+        await engine.dispose()
+
+
+def run(main):
+    async def wrapper():
+        init_engines()
+        try:
+            return await main()
+        finally:
+            await dispose_engines()
+
+    return asyncio.run(wrapper())
+
+
+def test_sweep_releases_lock(db, monkeypatch):
+    sweeper = make_sweeper(monkeypatch)
+
+    async def main():
+        assert await sweeper.sweep() == {"revoked": 0, "refresh": 0}
+        assert await lock_is_free(sweeper.lock_key)
+
+    run(main)
+
+
+def test_failed_unlock_closes_connection(db, monkeypatch):
+    sweeper = make_sweeper(monkeypatch)
+
+    def fail_unlock(conn, cursor, statement, parameters, context, executemany):
+        if "pg_advisory_unlock" in statement:
+            raise RuntimeError("connection lost")
+
+    async def main():
+        sync_engine = db_engine.engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", fail_unlock)
+        try:
+            assert await sweeper.sweep() == {"revoked": 0, "refresh": 0}
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", fail_unlock)
+
+        assert await lock_is_free(sweeper.lock_key)
+
+    run(main)
+
+
+def test_cancelled_sweep_releases_lock(db, monkeypatch):
+    sweeper = make_sweeper(monkeypatch)
+    started = asyncio.Event()
+
+    async def delete_expired(model, expired):
+        started.set()
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(sweeper, "delete_expired", delete_expired)
+
+    async def main():
+        task = asyncio.create_task(sweeper.sweep())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert await lock_is_free(sweeper.lock_key)
+
+    run(main)
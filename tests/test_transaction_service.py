@@ -0,0 +1,130 @@
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+
+from app.services.invalidation import invalidation_bus
+from app.services.transaction_service import BatchResult, TransactionService
+from database.models import Account, AccountDailyRollup, User
+
+# Вне диапазона счетов тестовых данных; всё откатывается после теста
+ACCOUNT_ID = 900_000_001
+NEW_ACCOUNT_ID = 900_000_002
+
+
+async def create_users(session) -> tuple[int, int]:
+    """:return: владелец счёта ACCOUNT_ID (баланс 10.00) и другой пользователь"""
+    owner, payer = (
+        User(email=f"{uuid.uuid4().hex}@example.com", password_hash="-")
+        for _ in range(2)
+    )
+    session.add_all([owner, payer])
+    await session.flush()
+    session.add(Account(id=ACCOUNT_ID, user_id=owner.id, balance=Decimal("10.00")))
+    await session.flush()
+    return owner.id, payer.id
+
+
+def test_apply_batch_running_balances_and_owners(
+    in_transaction, query_budget, make_payload, monkeypatch
+):
+    monkeypatch.setattr(invalidation_bus, "enabled", False)
+
+    async def test(session):
+        owner_id, payer_id = await create_users(session)
+        first = make_payload("5.00", user_id=payer_id, account_id=ACCOUNT_ID)
+        payloads = [
+            first,
+            make_payload("-3.00", user_id=payer_id, account_id=ACCOUNT_ID),
+            first,
+            make_payload("7.00", user_id=payer_id, account_id=NEW_ACCOUNT_ID),
+        ]
+
+        before = query_budget.count
+        result = await TransactionService.apply_batch(payloads, session)
+        # Один воркер: без pg_notify для кэша счетов
+        assert query_budget.count - before == 1
+
+        assert result.balances == {
+            first.transaction_id: Decimal("15.00"),
+            payloads[1].transaction_id: Decimal("12.00"),
+            payloads[3].transaction_id: Decimal("7.00"),
+        }
+        # Кэш сбрасывается владельцу счёта, а не отправителю вебхука;
+        # новый счёт создаётся на пользователя из вебхука
+        assert result.owners == {owner_id, payer_id}
+        new_account = await session.get(Account, NEW_ACCOUNT_ID)
+        assert new_account.user_id == payer_id
+
+        # Повтор уже применённого вебхука ничего не меняет
+        assert await TransactionService.apply_batch([first], session) == BatchResult(
+            {}, set()
+        )
+        assert (await session.get(Account, ACCOUNT_ID)).balance == Decimal("12.00")
+
+    in_transaction(test)
+
+
+def test_apply_batch_updates_daily_rollups(in_transaction, make_payload):
+    async def test(session):
+        _, payer_id = await create_users(session)
+        first = make_payload("5.00", user_id=payer_id, account_id=ACCOUNT_ID)
+        await TransactionService.apply_batch(
+            [
+                first,
+                make_payload("-3.00", user_id=payer_id, account_id=ACCOUNT_ID),
+                first,
+            ],
+            session,
+        )
+
+        rollup = await session.scalar(
+            select(AccountDailyRollup).where(
+                AccountDailyRollup.account_id == ACCOUNT_ID,
+                AccountDailyRollup.day == datetime.now(timezone.utc).date(),
+            )
+        )
+        assert (rollup.incoming, rollup.outgoing, rollup.transactions_count) == (
+            Decimal("5.00"), Decimal("3.00"), 2,
+        )
+
+    in_transaction(test)
+
+
+def test_apply_each_fails_only_the_bad_payload(in_transaction, make_payload):
+    async def test(session):
+        owner_id, _ = await create_users(session)
+        await session.commit()
+        payloads = [
+            make_payload("1.00", user_id=owner_id, account_id=ACCOUNT_ID),
+            # Нет такого пользователя: нарушение внешнего ключа
+            make_payload("2.00", user_id=-1, account_id=ACCOUNT_ID),
+            make_payload("4.00", user_id=owner_id, account_id=ACCOUNT_ID),
+        ]
+
+        results = await TransactionService.apply_each(payloads, session)
+
+        assert isinstance(results[1], DBAPIError)
+        assert results[0].balances == {payloads[0].transaction_id: Decimal("11.00")}
+        assert results[2].balances == {payloads[2].transaction_id: Decimal("15.00")}
+
+    in_transaction(test)
+
+
+def test_apply_batch_notifies_other_workers(
+    in_transaction, query_budget, make_payload, monkeypatch
+):
+    monkeypatch.setattr(invalidation_bus, "enabled", True)
+
+    async def test(session):
+        owner_id, _ = await create_users(session)
+        before = query_budget.count
+        await TransactionService.apply_batch(
+            [make_payload("1.00", user_id=owner_id, account_id=ACCOUNT_ID)], session
+        )
+        # Вебхук и pg_notify для кэша счетов в других воркерах
+        assert query_budget.count - before == 2
+
+    in_transaction(test)
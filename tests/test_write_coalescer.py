@@ -0,0 +1,112 @@
+import asyncio
+from collections import defaultdict
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.schemas.webhook import WebhookPayload
+from app.services.transaction_service import BatchResult, TransactionService
+from app.services.write_coalescer import AccountWriteCoalescer
+
+BAD_USER_ID = -1
+
+
+class Ledger:
+    """apply_batch без базы: балансы в памяти, BAD_USER_ID роняет всю пачку."""
+
+    def __init__(self):
+        self.balances = defaultdict(Decimal)
+        self.applied = set()
+        self.calls: list[list[WebhookPayload]] = []
+
+    async def apply_batch(self, payloads, session) -> BatchResult:
+        payloads = list(payloads)
+        self.calls.append(payloads)
+        if any(payload.user_id == BAD_USER_ID for payload in payloads):
+            raise IntegrityError("INSERT INTO transactions", {}, Exception("fk"))
+
+        result = BatchResult({}, set())
+        for payload in payloads:
+            if payload.transaction_id in self.applied:
+                continue
+            self.applied.add(payload.transaction_id)
+            self.balances[payload.account_id] += payload.amount
+            result.balances[payload.transaction_id] = self.balances[payload.account_id]
+            result.owners.add(payload.user_id)
+        return result
+
+
+@pytest.fixture
+def ledger(monkeypatch) -> Ledger:
+    ledger = Ledger()
+    monkeypatch.setattr(TransactionService, "apply_batch", ledger.apply_batch)
+    return ledger
+
+
+def submit_all(coalescer: AccountWriteCoalescer, payloads: list[WebhookPayload]) -> list:
+    async def main():
+        return await asyncio.gather(
+            *(coalescer.submit(payload) for payload in payloads),
+            return_exceptions=True,
+        )
+
+    return asyncio.run(main())
+
+
+def test_window_is_applied_as_one_batch_with_own_balances(ledger, make_payload):
+    coalescer = AccountWriteCoalescer(window=0.01, max_batch=100)
+
+    results = submit_all(
+        coalescer, [make_payload("1.00"), make_payload("2.00"), make_payload("3.00")]
+    )
+
+    assert len(ledger.calls) == 1
+    assert results == [Decimal("1.00"), Decimal("3.00"), Decimal("6.00")]
+
+
+def test_accounts_are_batched_separately(ledger, make_payload):
+    coalescer = AccountWriteCoalescer(window=0.01, max_batch=100)
+
+    results = submit_all(
+        coalescer,
+        [make_payload("1.00", account_id=1), make_payload("2.00", account_id=2)],
+    )
+
+    assert len(ledger.calls) == 2
+    assert results == [Decimal("1.00"), Decimal("2.00")]
+
+
+def test_repeat_within_window_is_duplicate(ledger, make_payload):
+    coalescer = AccountWriteCoalescer(window=0.01, max_batch=100)
+    payload = make_payload("5.00")
+
+    assert submit_all(coalescer, [payload, payload]) == [Decimal("5.00"), None]
+
+
+def test_full_batch_is_flushed_before_the_window(ledger, make_payload):
+    coalescer = AccountWriteCoalescer(window=10, max_batch=2)
+
+    results = submit_all(coalescer, [make_payload("1.00"), make_payload("1.00")])
+
+    assert len(ledger.calls) == 1
+    assert results == [Decimal("1.00"), Decimal("2.00")]
+
+
+def test_failing_webhook_does_not_fail_its_neighbours(ledger, make_payload):
+    coalescer = AccountWriteCoalescer(window=0.01, max_batch=100)
+
+    results = submit_all(
+        coalescer,
+        [
+            make_payload("1.00"),
+            make_payload("2.00", user_id=BAD_USER_ID),
+            make_payload("4.00"),
+        ],
+    )
+
+    # Пачка целиком, затем по одному
+    assert [len(call) for call in ledger.calls] == [3, 1, 1, 1]
+    assert results[0] == Decimal("1.00")
+    assert isinstance(results[1], IntegrityError)
+    assert results[2] == Decimal("5.00")